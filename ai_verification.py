@@ -3,17 +3,44 @@ AI Verification Module for HealthVerify Patient Eligibility System
 Handles document processing, validation, and patient classification
 """
 
-import numpy as np
-import cv2
-from PIL import Image
+from __future__ import annotations
+
+import copy
+import hashlib
 import re
+import threading
+from contextlib import nullcontext
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, List, Tuple, Optional
 
+import document_ingest
+from confidence_scoring import ConfidenceScorer
+from instrumentation import INSTRUMENTATION
+from lazy_imports import lazy_import
+
+# Only document verification needs these; pain triage requests never load them
+np = lazy_import('numpy')
+cv2 = lazy_import('cv2')
+Image = lazy_import('PIL.Image')
+
 class DocumentVerifier:
-    """AI-powered document verification system"""
+    """AI-powered document verification system
+    
+    The simulated OCR, confidence and fraud draws come from a per-instance
+    ``numpy.random.Generator`` rather than the global ``np.random`` state.
+    Pass ``rng`` (e.g. ``np.random.default_rng(42)``) for a reproducible
+    sequence, or ``seed_from_image=True`` to derive each document's draws
+    from a hash of its pixels, so the same upload always yields the same
+    result regardless of call order or thread.
+    """
     
-    def __init__(self):
+    def __init__(self, rng: Optional[np.random.Generator] = None, seed_from_image: bool = False):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.seed_from_image = seed_from_image
+        self._rng_lock = threading.Lock()
+        
         self.supported_documents = {
             'south_african_id': {
                 'pattern': r'^[0-9]{13}$',
@@ -33,7 +60,7 @@ class DocumentVerifier:
             }
         }
         
-        # Mock AI model confidence factors
+        # Weights of the confidence scoring factors
         self.confidence_factors = {
             'document_quality': 0.3,
             'text_clarity': 0.25,
@@ -41,11 +68,12 @@ class DocumentVerifier:
             'format_compliance': 0.15,
             'database_match': 0.1
         }
+        self.confidence_scorer = ConfidenceScorer(self.confidence_factors)
     
     def preprocess_image(self, image: Image.Image) -> np.ndarray:
         """Preprocess uploaded image for OCR and analysis"""
-        # Convert PIL image to OpenCV format
-        img_array = np.array(image)
+        # Convert PIL image to OpenCV format (arrays, e.g. spooled memmaps, are not copied)
+        img_array = np.asarray(image)
         
         # Convert to grayscale
         if len(img_array.shape) == 3:
@@ -62,7 +90,21 @@ class DocumentVerifier:
         
         return enhanced
     
-    def extract_text_from_image(self, processed_image: np.ndarray) -> str:
+    def document_rng(self, processed_image: Optional[np.ndarray] = None) -> np.random.Generator:
+        """Generator for one document's draws, safe to use without locking
+        
+        Generators are not thread-safe, so each document gets its own: seeded
+        from the image hash in ``seed_from_image`` mode, otherwise spawned
+        from the instance generator under a lock.
+        """
+        if self.seed_from_image and processed_image is not None:
+            digest = hashlib.blake2b(np.ascontiguousarray(processed_image).data, digest_size=16)
+            return np.random.default_rng(int.from_bytes(digest.digest(), 'little'))
+        with self._rng_lock:
+            return self.rng.spawn(1)[0]
+    
+    def extract_text_from_image(self, processed_image: np.ndarray,
+                                rng: Optional[np.random.Generator] = None) -> str:
         """Simulate OCR text extraction from document image"""
         # In a real implementation, this would use OCR libraries like Tesseract
         # For demo purposes, we'll simulate extracted text based on document type
@@ -75,7 +117,8 @@ class DocumentVerifier:
         ]
         
         # Randomly select one for simulation
-        return np.random.choice(mock_extractions)
+        rng = rng or self.document_rng(processed_image)
+        return mock_extractions[rng.integers(len(mock_extractions))]
     
     def validate_sa_id(self, id_number: str) -> Tuple[bool, Dict]:
         """Validate South African ID number using Luhn algorithm"""
@@ -125,8 +168,21 @@ class DocumentVerifier:
             'age': datetime.now().year - full_year
         }
     
-    def classify_patient(self, document_info: Dict) -> Dict:
-        """Classify patient based on document analysis"""
+    def format_matches(self, document_type: str, document_number: str) -> bool:
+        """Whether the extracted number has the expected format for the document type"""
+        key = document_type.lower().replace(' ', '_')
+        key = 'south_african_id' if key == 'sa_id' else key
+        pattern = self.supported_documents.get(key, {}).get('pattern', r'^[A-Z0-9]{6,13}$')
+        return bool(re.match(pattern, document_number))
+    
+    def classify_patient(self, document_info: Dict,
+                         rng: Optional[np.random.Generator] = None,
+                         base_confidence: Optional[float] = None) -> Dict:
+        """Classify patient based on document analysis
+        
+        ``base_confidence`` is normally the confidence scorer's 0-100 score;
+        without it a simulated base is drawn from ``rng``.
+        """
         
         if document_info.get('citizenship') == 'citizen':
             category = 'citizen'
@@ -142,8 +198,10 @@ class DocumentVerifier:
             confidence_boost = -10
         
         # Base confidence calculation
-        base_confidence = np.random.randint(60, 90)
-        final_confidence = min(99, max(30, base_confidence + confidence_boost))
+        if base_confidence is None:
+            rng = rng or self.document_rng()
+            base_confidence = int(rng.integers(60, 90))
+        final_confidence = min(99, max(30, round(base_confidence) + confidence_boost))
         
         return {
             'category': category,
@@ -152,7 +210,8 @@ class DocumentVerifier:
             'classification_details': document_info
         }
     
-    def detect_fraud_indicators(self, image: np.ndarray, extracted_text: str) -> List[str]:
+    def detect_fraud_indicators(self, image: np.ndarray, extracted_text: str,
+                                rng: Optional[np.random.Generator] = None) -> List[str]:
         """Detect potential fraud indicators in document"""
         red_flags = []
         
@@ -174,61 +233,194 @@ class DocumentVerifier:
             ("Unusual document wear patterns", 0.04)
         ]
         
+        rng = rng or self.document_rng(image)
         for flag, probability in fraud_checks:
-            if np.random.random() < probability:
+            if rng.random() < probability:
                 red_flags.append(flag)
         
         return red_flags
     
+    def _stage(self, name: str):
+        """Time one pipeline stage; a no-op while instrumentation is disabled"""
+        return INSTRUMENTATION.timer(f"verification.{name}_ms")
+    
     def verify_document(self, image: Image.Image, document_type: str) -> Dict:
         """Main verification pipeline"""
+        return self.verify_documents([image], document_type)[0]
+    
+    def verify_documents(self, images: List[Image.Image], document_type: str) -> List[Dict]:
+        """Verify a batch of documents, scoring their confidence together
+        
+        Each document is preprocessed, read and checked on its own; only a
+        small thumbnail is kept, and the confidence factors for the whole
+        batch are then evaluated in one vectorized pass.
+        """
+        results = [None] * len(images)
+        pending = []
+        for index, image in enumerate(images):
+            try:
+                # Preprocess image
+                with self._stage('preprocess'):
+                    processed_image = self.preprocess_image(image)
+                    rng = self.document_rng(processed_image)
+                
+                # Extract text
+                with self._stage('ocr'):
+                    extracted_text = self.extract_text_from_image(processed_image, rng)
+                
+                # Validate based on document type
+                with self._stage('validation'):
+                    if document_type.lower() in ['south african id', 'sa id']:
+                        is_valid, doc_info = self.validate_sa_id(extracted_text)
+                    else:
+                        # Simplified validation for other documents
+                        is_valid = bool(re.match(r'^[A-Z0-9]{6,13}$', extracted_text))
+                        doc_info = {'document_number': extracted_text}
+                
+                # Detect fraud indicators
+                with self._stage('fraud_checks'):
+                    red_flags = self.detect_fraud_indicators(processed_image, extracted_text, rng)
+                
+                thumbnail = self.confidence_scorer.thumbnail(processed_image)
+                pending.append((index, thumbnail, extracted_text, is_valid, doc_info, red_flags))
+                del processed_image
+            except Exception as e:
+                results[index] = self._error_result(e)
+        
+        if not pending:
+            return results
+        
         try:
-            # Preprocess image
-            processed_image = self.preprocess_image(image)
-            
-            # Extract text
-            extracted_text = self.extract_text_from_image(processed_image)
-            
-            # Validate based on document type
-            if document_type.lower() in ['south african id', 'sa id']:
-                is_valid, doc_info = self.validate_sa_id(extracted_text)
-            else:
-                # Simplified validation for other documents
-                is_valid = bool(re.match(r'^[A-Z0-9]{6,13}$', extracted_text))
-                doc_info = {'document_number': extracted_text}
-            
+            # Score confidence for the batch
+            with self._stage('confidence'):
+                scores = self.confidence_scorer.score_batch(
+                    [item[1] for item in pending],
+                    [self.format_matches(document_type, item[2]) for item in pending],
+                    [item[3] for item in pending],
+                    [len(item[5]) for item in pending])
+        except Exception as e:
+            for item in pending:
+                results[item[0]] = self._error_result(e)
+            return results
+        
+        for (index, _, extracted_text, is_valid, doc_info, red_flags), score in zip(pending, scores):
             # Classify patient
-            classification = self.classify_patient(doc_info)
-            
-            # Detect fraud indicators
-            red_flags = self.detect_fraud_indicators(processed_image, extracted_text)
+            with self._stage('classification'):
+                classification = self.classify_patient(doc_info, base_confidence=score['score'])
             
             # Compile results
-            result = {
+            results[index] = {
                 'document_valid': is_valid,
                 'extracted_text': extracted_text,
                 'category': classification['category'],
                 'eligibility': classification['eligibility'],
                 'confidence': classification['confidence'],
+                'confidence_factors': score['factors'],
                 'red_flags': red_flags,
                 'document_info': doc_info,
                 'processing_timestamp': datetime.now().isoformat()
             }
-            
-            return result
-            
-        except Exception as e:
-            return {
+        
+        return results
+    
+    @staticmethod
+    def _error_result(error: Exception) -> Dict:
+        return {
+            'error': f"Verification failed: {str(error)}",
+            'document_valid': False,
+            'confidence': 0,
+            'red_flags': ['Processing error occurred']
+        }
+
+    def verify_upload(self, source, document_type: str,
+                      max_pixels: int = document_ingest.DEFAULT_MAX_PIXELS,
+                      trace_memory: bool = False) -> Dict:
+        """Verify an uploaded file page by page with bounded memory
+        
+        Pages are decoded lazily to grayscale at no more than ``max_pixels``;
+        the most confident page's result is returned, with an ``ingestion``
+        report of page count and largest decoded page. ``trace_memory=True``
+        adds the tracemalloc peak; tracing is process-wide and slows every
+        allocation, so keep it to benchmarks and single-request diagnostics.
+        """
+        report = {'pages': 0, 'page_buffer_bytes': 0}
+        best = None
+        tracking = document_ingest.track_peak_memory(report) if trace_memory else nullcontext()
+        try:
+            with tracking:
+                pages = document_ingest.iter_pages(source, max_pixels=max_pixels)
+                while True:
+                    with self._stage('ingest'):
+                        page = next(pages, None)
+                    if page is None:
+                        break
+                    report['pages'] += 1
+                    report['page_buffer_bytes'] = max(report['page_buffer_bytes'],
+                                                      page.width * page.height)
+                    result = self.verify_document(page, document_type)
+                    if best is None or result.get('confidence', 0) > best.get('confidence', 0):
+                        best = result
+                    del page
+        except (document_ingest.DocumentTooLarge, OSError) as e:
+            best = {
                 'error': f"Verification failed: {str(e)}",
                 'document_valid': False,
                 'confidence': 0,
-                'red_flags': ['Processing error occurred']
+                'red_flags': ['Document could not be ingested']
             }
+        
+        best = best or {
+            'error': 'Verification failed: document has no pages',
+            'document_valid': False,
+            'confidence': 0,
+            'red_flags': ['Document could not be ingested']
+        }
+        best['ingestion'] = report
+        return best
+
+class FrozenDict(dict):
+    """Read-only dict; still a dict for callers and JSON serialization"""
+    
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("cached eligibility results are read-only")
+    
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+    
+    # Copies and unpickled results (e.g. st.cache_data) are ordinary, mutable dicts
+    def __copy__(self):
+        return dict(self)
+    
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(dict(self), memo)
+    
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+def _freeze(value):
+    """Recursively convert rule tables to read-only mappings and tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
 
 class EligibilityEngine:
-    """Healthcare eligibility determination engine"""
+    """Healthcare eligibility determination engine
+    
+    Rules and tariffs are stored read-only and can only be changed by
+    assigning ``eligibility_rules`` or ``service_costs``; either assignment
+    bumps ``rules_version`` and empties the cost estimate cache, which is
+    keyed by (rules version, category, services).
+    """
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 1024):
+        self.rules_version = 0
+        self._version_lock = threading.Lock()
+        self._cost_cache = lru_cache(maxsize=cache_size)(self._compute_estimated_cost)
+        
         self.eligibility_rules = {
             'citizen': {
                 'free_services': [
@@ -268,6 +460,42 @@ class EligibilityEngine:
                 ]
             }
         }
+        
+        # Mock pricing data
+        self.service_costs = {
+            'emergency_care': 1500,
+            'primary_healthcare': 300,
+            'specialist_consultation': 800,
+            'chronic_medication': 450,
+            'maternal_care': 2000,
+            'elective_surgery': 15000
+        }
+    
+    @property
+    def eligibility_rules(self):
+        return self._eligibility_rules
+    
+    @eligibility_rules.setter
+    def eligibility_rules(self, rules: Dict):
+        self._eligibility_rules = _freeze(rules)
+        self._rules_changed()
+    
+    @property
+    def service_costs(self):
+        return self._service_costs
+    
+    @service_costs.setter
+    def service_costs(self, costs: Dict):
+        self._service_costs = _freeze(costs)
+        self._rules_changed()
+    
+    def _rules_changed(self):
+        with self._version_lock:
+            self.rules_version += 1
+            self._cost_cache.cache_clear()
+    
+    def cache_info(self):
+        return self._cost_cache.cache_info()
     
     def get_service_eligibility(self, patient_category: str, service_type: str) -> Dict:
         """Determine eligibility for specific healthcare service"""
@@ -283,16 +511,18 @@ class EligibilityEngine:
             return {'eligible': False, 'payment_required': 'review', 'fee_percentage': None}
     
     def calculate_estimated_cost(self, services: List[str], patient_category: str) -> Dict:
-        """Calculate estimated healthcare costs for patient"""
-        # Mock pricing data
-        service_costs = {
-            'emergency_care': 1500,
-            'primary_healthcare': 300,
-            'specialist_consultation': 800,
-            'chronic_medication': 450,
-            'maternal_care': 2000,
-            'elective_surgery': 15000
-        }
+        """Calculate estimated healthcare costs for patient
+        
+        Results are cached and shared between callers, so they are returned
+        read-only; copy before modifying.
+        """
+        INSTRUMENTATION.increment('eligibility.cost_cache_lookups')
+        return self._cost_cache(self.rules_version, patient_category, tuple(services))
+    
+    def _compute_estimated_cost(self, rules_version: int, patient_category: str,
+                                services: Tuple[str, ...]) -> Dict:
+        INSTRUMENTATION.increment('eligibility.cost_cache_misses')
+        service_costs = self.service_costs
         
         total_cost = 0
         cost_breakdown = []
@@ -307,18 +537,18 @@ class EligibilityEngine:
                 patient_cost = base_cost  # Full cost if needs review
             
             total_cost += patient_cost
-            cost_breakdown.append({
+            cost_breakdown.append(FrozenDict({
                 'service': service,
                 'base_cost': base_cost,
                 'patient_cost': patient_cost,
                 'coverage': eligibility['payment_required']
-            })
+            }))
         
-        return {
+        return FrozenDict({
             'total_estimated_cost': total_cost,
-            'cost_breakdown': cost_breakdown,
+            'cost_breakdown': tuple(cost_breakdown),
             'currency': 'ZAR'
-        }
+        })
 
 # Helper functions for Streamlit integration
 def get_verification_summary(result: Dict) -> str:
@@ -353,3 +583,33 @@ def get_verification_summary(result: Dict) -> str:
         summary += f"\n**⚠️ Alerts:** {len(result['red_flags'])} issue(s) detected"
     
     return summary
+
+def verify_returning_patient(verifier: DocumentVerifier, data_manager, patient_id: str,
+                             source, document_type: str,
+                             max_age_days: int = 30, alert_monitor=None) -> Dict:
+    """Reuse a recent valid verification if the patient has one, else verify and store
+    
+    ``data_manager`` is a data_utils.SecureDataManager and ``source`` anything
+    ``verify_upload`` accepts. Reused results carry ``reused_verification_id``
+    and skip document processing entirely. New results are fed to
+    ``alert_monitor`` (an alerting.AlertMonitor), if given.
+    """
+    previous = data_manager.find_reusable_verification(patient_id, max_age_days=max_age_days)
+    if previous is not None:
+        return {
+            'document_valid': previous['document_valid'],
+            'category': previous['category'],
+            'eligibility': previous['eligibility'],
+            'confidence': previous['confidence'],
+            'red_flags': previous['red_flags'],
+            'processing_timestamp': previous['created_timestamp'],
+            'reused_verification_id': previous['id']
+        }
+    
+    result = verifier.verify_upload(source, document_type)
+    if not result.get('error'):
+        result['verification_id'] = data_manager.store_verification(
+            dict(result, patient_id=patient_id, document_type=document_type))
+        if alert_monitor is not None:
+            alert_monitor.observe_verification(result)
+    return result
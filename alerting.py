@@ -0,0 +1,172 @@
+"""
+Automatic Alerting for HealthVerify / PainEase
+Raises alerts from fraud red-flag rates and latency thresholds, evaluated
+incrementally on rolling counters as events arrive instead of by rescanning
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from live_metrics import RollingCounter
+
+# Latency limits in milliseconds, matched against timer names by prefix
+DEFAULT_LATENCY_THRESHOLDS = {
+    'http.': 1000,
+    'db.': 250,
+    'verification.': 5000,
+}
+
+logger = logging.getLogger(__name__)
+
+
+class _RateWindow:
+    """Matching / total events over a sliding window"""
+
+    def __init__(self, window_seconds: int):
+        self.total = RollingCounter(window_seconds, bucket_seconds=60)
+        self.matching = RollingCounter(window_seconds, bucket_seconds=60)
+
+    def add(self, matched: bool, now: float):
+        self.total.add(now)
+        if matched:
+            self.matching.add(now)
+
+    def rate(self, now: float):
+        total = self.total.value(now)
+        return total, (self.matching.value(now) / total if total else 0.0)
+
+
+class AlertMonitor:
+    """Feeds verification results and timings into alert rules
+
+    Each rule keeps rolling counters, so evaluating it is O(1) per event.
+    While a rule stays breached it re-raises its alert at most once per
+    ``cooldown_seconds``; the store folds repeats into the open alert's
+    occurrence count. Raised alerts are queued and written by a background
+    thread, so the request that crossed a threshold never waits on the
+    alerts table, and that thread's own DB timings are not observed.
+    """
+
+    def __init__(self, data_manager, window_seconds: int = 3600,
+                 red_flag_rate_threshold: float = 0.2,
+                 latency_thresholds: Dict[str, float] = None,
+                 slow_rate_threshold: float = 0.1, min_samples: int = 20,
+                 cooldown_seconds: float = 300, max_pending: int = 100,
+                 retry_interval: float = 5.0):
+        self.data_manager = data_manager
+        self.window_seconds = window_seconds
+        self.red_flag_rate_threshold = red_flag_rate_threshold
+        self.latency_thresholds = latency_thresholds or DEFAULT_LATENCY_THRESHOLDS
+        self.slow_rate_threshold = slow_rate_threshold
+        self.min_samples = min_samples
+        self.cooldown_seconds = cooldown_seconds
+
+        self._lock = threading.Lock()
+        self._red_flags = _RateWindow(window_seconds)
+        self._latency: Dict[str, _RateWindow] = {}
+        self._threshold_for: Dict[str, Optional[float]] = {}
+        self._last_raised: Dict[str, float] = {}
+
+        self.retry_interval = retry_interval
+        self._pending = deque(maxlen=max_pending)
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._writer = None
+        self._pid = None
+
+    def observe_verification(self, result: Dict, timestamp: float = None):
+        """Count one verification result towards the red-flag rate"""
+        now = timestamp or time.time()
+        with self._lock:
+            self._red_flags.add(bool(result.get('red_flags')), now)
+            total, rate = self._red_flags.rate(now)
+        if total >= self.min_samples and rate >= self.red_flag_rate_threshold:
+            self._raise('fraud_rate', 'high',
+                        f"Red flags on more than {self.red_flag_rate_threshold:.0%} "
+                        f"of verifications in the last {self.window_seconds // 60} minutes", now)
+
+    def observe_latency(self, name: str, value_ms: float):
+        """Instrumentation sink: count slow calls per timer"""
+        if threading.current_thread() is self._writer:
+            return  # the alert writes themselves; a slow DB must not feed its own alerts
+        threshold = self._threshold_for.get(name, -1)
+        if threshold == -1:
+            threshold = next((limit for prefix, limit in self.latency_thresholds.items()
+                              if name.startswith(prefix)), None)
+            self._threshold_for[name] = threshold
+        if threshold is None:
+            return
+
+        now = time.time()
+        with self._lock:
+            window = self._latency.get(name)
+            if window is None:
+                window = self._latency[name] = _RateWindow(self.window_seconds)
+            window.add(value_ms > threshold, now)
+            total, rate = window.rate(now)
+        if total >= self.min_samples and rate >= self.slow_rate_threshold:
+            self._raise('latency', 'medium',
+                        f"{name} over {threshold:g} ms on more than "
+                        f"{self.slow_rate_threshold:.0%} of calls", now)
+
+    def _raise(self, alert_type: str, severity: str, message: str, now: float):
+        with self._lock:
+            if now - self._last_raised.get(message, float('-inf')) < self.cooldown_seconds:
+                return
+            self._last_raised[message] = now
+            self._pending.append((alert_type, severity, message))
+        self._ensure_writer()
+        self._wakeup.set()
+
+    def _ensure_writer(self):
+        # Started lazily per process so preforked workers each get their own
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            if self._pid is not None:
+                # Inherited from the parent across fork; the parent writes these
+                self._pending.clear()
+            self._pid = pid
+            self._writer = threading.Thread(target=self._run, name='alert-writer', daemon=True)
+            self._writer.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if not self.flush():
+                # The store is unavailable; the alert stays queued for the next attempt
+                self._stopped.wait(self.retry_interval)
+                self._wakeup.set()
+
+    def flush(self) -> bool:
+        """Write queued alerts; False if the store failed and some remain queued"""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    return True
+                alert = self._pending[0]
+            try:
+                self.data_manager.create_alert(*alert)
+            except Exception:
+                logger.exception("writing alert failed")
+                return False
+            with self._lock:
+                # Unless max_pending pushed it out while it was being written
+                if self._pending and self._pending[0] is alert:
+                    self._pending.popleft()
+
+    def stop(self):
+        """Stop the writer thread and write whatever is queued"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._writer is not None and self._pid == os.getpid():
+            self._writer.join(timeout=self.retry_interval + 1)
+        self.flush()
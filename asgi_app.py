@@ -0,0 +1,161 @@
+"""
+Async (ASGI) variant of the PainEase API
+Same JSON contract as /api/assess_pain and /api/update_pain in flask_app,
+with store access offloaded to a thread pool so the event loop never blocks
+
+    uvicorn asgi_app:app --workers 1
+"""
+
+import asyncio
+import contextlib
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from data_utils import SecureDataManager
+from instrumentation import INSTRUMENTATION
+from storage_backends import backend_from_url
+from system_metrics import SystemMetricsRecorder
+from pain_triage import PAIN_DESCRIPTIONS, assess_pain_emergency, get_relief_recommendations
+
+
+class AsyncSQLiteExecutor:
+    """Runs blocking SecureDataManager calls on a dedicated thread pool
+
+    SQLite serialises writers anyway, so a few threads are enough to keep
+    the event loop free while thousands of connections wait on the store.
+    """
+
+    def __init__(self, data_manager: SecureDataManager, max_workers: int = 4,
+                 metrics_recorder: SystemMetricsRecorder = None):
+        self.data_manager = data_manager
+        self.metrics_recorder = metrics_recorder
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='painease-sqlite')
+
+    @property
+    def queue_depth(self) -> int:
+        """Store calls waiting for a free thread"""
+        return self._executor._work_queue.qsize()
+
+    async def call(self, method: str, *args, **kwargs):
+        """Await ``data_manager.<method>(*args, **kwargs)`` without blocking the loop"""
+        if self.metrics_recorder is not None:
+            self.metrics_recorder.record('asgi.store_queue_depth', self.queue_depth)
+        loop = asyncio.get_running_loop()
+        bound = functools.partial(getattr(self.data_manager, method), *args, **kwargs)
+        return await loop.run_in_executor(self._executor, bound)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+async def assess_pain(request):
+    data = await request.json()
+
+    pain_level = int(data.get('pain_level', 5))
+    pain_type = data.get('pain_type', '')
+    location = data.get('location', '')
+    duration = data.get('duration', '')
+    symptoms = data.get('symptoms', [])
+
+    assessment = {
+        'level': pain_level,
+        'type': pain_type,
+        'location': location,
+        'duration': duration,
+        'symptoms': symptoms,
+        'timestamp': datetime.now().isoformat()
+    }
+
+    # Check for emergency
+    is_emergency = assess_pain_emergency(pain_level, symptoms)
+
+    store = request.app.state.store
+    assessment_id = await store.call('store_pain_assessment', assessment, is_emergency)
+
+    # Only the id goes in the cookie; the assessment itself lives in the store
+    request.session['assessment_id'] = assessment_id
+
+    if is_emergency:
+        return JSONResponse({
+            'status': 'emergency',
+            'message': 'Emergency medical attention required'
+        })
+
+    # Get recommendations
+    recommendations = get_relief_recommendations(pain_level, pain_type, location, symptoms)
+
+    return JSONResponse({
+        'status': 'success',
+        'recommendations': recommendations,
+        'pain_description': PAIN_DESCRIPTIONS[pain_level],
+        'warning': pain_level >= 7
+    })
+
+
+async def update_pain(request):
+    data = await request.json()
+    new_pain_level = int(data.get('pain_level', 5))
+
+    assessment_id = request.session.get('assessment_id')
+    progress = None
+    if assessment_id:
+        store = request.app.state.store
+        progress = await store.call('record_pain_progress', assessment_id, new_pain_level)
+
+    if progress is None:
+        return JSONResponse({'status': 'error', 'message': 'No assessment found'})
+
+    improvement = progress['improvement']
+    return JSONResponse({
+        'status': 'success',
+        'improvement': improvement,
+        'message': f'Pain level updated. Improvement: {improvement} points'
+    })
+
+
+def create_app(db_path: str = None, store_workers: int = None) -> Starlette:
+    """Build the ASGI application"""
+    db_path = db_path or os.environ.get('DATABASE_PATH', 'painease_data.db')
+    store_workers = store_workers or int(os.environ.get('PAINEASE_STORE_THREADS', 4))
+
+    database_url = os.environ.get('DATABASE_URL')
+    data_manager = SecureDataManager(db_path, backend=backend_from_url(database_url) if database_url else None)
+    metrics_recorder = SystemMetricsRecorder(data_manager)
+    if os.environ.get('PAINEASE_INSTRUMENTATION', '1') != '0':
+        INSTRUMENTATION.enabled = True
+        INSTRUMENTATION.add_sink(metrics_recorder.record, 'system_metrics')
+    store = AsyncSQLiteExecutor(data_manager, max_workers=store_workers,
+                                metrics_recorder=metrics_recorder)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        yield
+        store.shutdown()
+        metrics_recorder.stop()
+
+    asgi_app = Starlette(
+        routes=[
+            Route('/api/assess_pain', assess_pain, methods=['POST']),
+            Route('/api/update_pain', update_pain, methods=['POST']),
+        ],
+        middleware=[
+            Middleware(SessionMiddleware,
+                       secret_key=os.environ.get('SECRET_KEY', 'painease-secret-key-change-in-production')),
+        ],
+        lifespan=lifespan,
+    )
+    asgi_app.state.store = store
+
+    return asgi_app
+
+
+app = create_app()
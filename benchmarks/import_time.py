@@ -0,0 +1,97 @@
+"""
+Import-time report and startup budget for the PainEase web workers
+
+Imports a module in a fresh interpreter under ``python -X importtime``,
+prints the slowest imports, and fails (exit status 1) if the import takes
+longer than --budget-ms or eagerly loads any of the heavy libraries that
+the pain triage paths never use.
+
+    python benchmarks/import_time.py                        # wsgi (flask_app + create_app)
+    python benchmarks/import_time.py --module asgi_app --budget-ms 800
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('numpy', 'pandas', 'cv2', 'PIL.Image', 'plotly.express')
+
+# Runs in the child: import the module, then report which heavy modules really executed
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+loaded = [name for name in {heavy!r}
+          if name in sys.modules and type(sys.modules[name]).__name__ != '_LazyModule']
+app = getattr({module}, 'app', None)
+startup = getattr(app, 'config', {{}}).get('STARTUP_TIME')
+print(json.dumps({{'import_seconds': elapsed, 'heavy_loaded': loaded, 'startup': startup}}))
+'''
+
+
+def parse_importtime(stderr: str):
+    """(cumulative_us, self_us, depth, module) rows from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(cumulative_us), int(self_us), depth, name.strip()))
+    return rows
+
+
+def measure(module: str) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT, PYTHONWARNINGS='ignore',
+                   DATABASE_PATH=os.path.join(workdir, 'import_time.db'))
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=workdir, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['imports'] = parse_importtime(proc.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--module', default='wsgi')
+    parser.add_argument('--budget-ms', type=float, default=500.0,
+                        help='maximum wall time for importing the module')
+    parser.add_argument('--top', type=int, default=15, help='slowest top-level imports to list')
+    args = parser.parse_args()
+
+    result = measure(args.module)
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    top_level = sorted((row for row in result['imports'] if row[2] <= 1), reverse=True)
+    for cumulative_us, self_us, depth, name in top_level[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {'  ' * depth}{name}")
+
+    import_ms = result['import_seconds'] * 1000
+    print(f"\nimport {args.module}: {import_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if result['startup']:
+        print(f"create_app: {result['startup']['create_app_seconds'] * 1000:.0f} ms")
+
+    failures = []
+    if import_ms > args.budget_ms:
+        failures.append(f"import took {import_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+    if result['heavy_loaded']:
+        failures.append(f"heavy modules loaded eagerly: {', '.join(result['heavy_loaded'])}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+Concurrent-connection load test: ASGI (uvicorn) vs WSGI (gunicorn) PainEase API
+
+Both servers run a single worker pinned to one CPU core and share the same
+SQLite-backed store. Each virtual patient submits an assessment and then a
+pain update with the returned session cookie, over a fresh connection per
+request, for every concurrency level.
+
+    python benchmarks/load_test_api.py --concurrency 1 10 50 200 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ASSESSMENT = {
+    'pain_level': 5,
+    'pain_type': 'dull',
+    'location': 'back',
+    'duration': '1-6h',
+    'symptoms': ['nausea']
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _pin_to_core():
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {0})
+
+
+def start_server(kind: str, port: int, db_path: str, threads: int) -> subprocess.Popen:
+    """Launch one single-worker server process"""
+    env = dict(os.environ, DATABASE_PATH=db_path, PAINEASE_ENV='production',
+               PAINEASE_WORKERS='1', PAINEASE_THREADS=str(threads),
+               PAINEASE_BIND=f'127.0.0.1:{port}')
+
+    if kind == 'asgi':
+        cmd = [sys.executable, '-m', 'uvicorn', 'asgi_app:app', '--host', '127.0.0.1',
+               '--port', str(port), '--workers', '1', '--log-level', 'warning', '--no-access-log']
+    else:
+        cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+               '--access-logfile', '/dev/null', 'wsgi:app']
+
+    proc = subprocess.Popen(cmd, cwd=REPO_ROOT, env=env, preexec_fn=_pin_to_core,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+
+    proc.kill()
+    raise RuntimeError(f"{kind} server did not start on port {port}")
+
+
+async def post_json(port: int, path: str, payload: dict, cookie: str = None):
+    """Minimal HTTP/1.1 POST; returns (status, set-cookie value)"""
+    body = json.dumps(payload).encode()
+    headers = [
+        f'POST {path} HTTP/1.1',
+        f'Host: 127.0.0.1:{port}',
+        'Content-Type: application/json',
+        f'Content-Length: {len(body)}',
+        'Connection: close',
+    ]
+    if cookie:
+        headers.append(f'Cookie: {cookie}')
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write('\r\n'.join(headers).encode() + b'\r\n\r\n' + body)
+        await writer.drain()
+        raw = await reader.read()
+    finally:
+        writer.close()
+
+    head = raw.split(b'\r\n\r\n', 1)[0].decode('latin-1').split('\r\n')
+    status = int(head[0].split()[1])
+    set_cookie = None
+    for line in head[1:]:
+        name, _, value = line.partition(':')
+        if name.lower() == 'set-cookie':
+            set_cookie = value.strip().split(';', 1)[0]
+    return status, set_cookie
+
+
+async def virtual_patient(port: int, stop_at: float, latencies: list, errors: list):
+    while time.perf_counter() < stop_at:
+        try:
+            started = time.perf_counter()
+            status, cookie = await post_json(port, '/api/assess_pain', ASSESSMENT)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+                continue
+
+            started = time.perf_counter()
+            status, _ = await post_json(port, '/api/update_pain', {'pain_level': 3}, cookie)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+        except OSError as exc:
+            errors.append(type(exc).__name__)
+
+
+def _percentile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_level(port: int, concurrency: int, duration: float) -> dict:
+    latencies, errors = [], []
+    started = time.perf_counter()
+    stop_at = started + duration
+    await asyncio.gather(*(virtual_patient(port, stop_at, latencies, errors)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies) or [0.0]
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput_rps': len(latencies) / elapsed,
+        'p50_ms': statistics.median(ordered) * 1000,
+        'p95_ms': _percentile(ordered, 0.95) * 1000,
+        'p99_ms': _percentile(ordered, 0.99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50, 100, 200])
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per level')
+    parser.add_argument('--wsgi-threads', type=int, default=1)
+    parser.add_argument('--servers', nargs='+', choices=['asgi', 'wsgi'], default=['wsgi', 'asgi'])
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args()
+
+    results = {}
+    for kind in args.servers:
+        with tempfile.TemporaryDirectory() as tmp:
+            port = _free_port()
+            proc = start_server(kind, port, os.path.join(tmp, 'load.db'), args.wsgi_threads)
+            try:
+                results[kind] = [asyncio.run(run_level(port, level, args.duration))
+                                 for level in args.concurrency]
+            finally:
+                proc.terminate()
+                proc.wait(timeout=10)
+
+    print(f"{'server':<6} {'conc':>5} {'reqs':>7} {'err':>5} {'rps':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for kind, levels in results.items():
+        for row in levels:
+            print(f"{kind:<6} {row['concurrency']:>5} {row['requests']:>7} {row['errors']:>5} "
+                  f"{row['throughput_rps']:>8.1f} {row['p50_ms']:>8.1f} "
+                  f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+"""
+Benchmark suite for the storage, verification and triage hot paths
+
+Each benchmark is timed timeit-style: calls are batched until a batch takes
+at least --min-time seconds, and the batch is repeated --repeat times.
+Storage benchmarks run against databases pre-filled by
+synthetic_data.SyntheticDataGenerator at every --rows size. Results can be
+written as JSON and compared against a stored baseline; the run exits with
+status 1 when any benchmark's median slows down by more than --threshold.
+
+    python benchmarks/run_benchmarks.py --rows 10000 1000000 --json results.json
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json -k analytics
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Measure the code itself, not the timers around it
+os.environ.setdefault('PAINEASE_INSTRUMENTATION', '0')
+
+import numpy as np
+
+IMAGE_SIZES = ('640x480', '1600x1200', '4000x3000')
+
+BENCHMARKS = []
+
+
+def benchmark(name: str, params=(None,)):
+    """Register ``func(ctx, param)``, which does its setup and returns the callable to time
+
+    ``params='rows'`` runs the benchmark once per --rows size.
+    """
+    def decorator(func):
+        BENCHMARKS.append((name, func, params))
+        return func
+    return decorator
+
+
+class BenchContext:
+    """Shared fixtures: one populated database per row count, created lazily"""
+
+    def __init__(self, workdir: str, seed: int):
+        self.workdir = workdir
+        self.seed = seed
+        self._managers = {}
+        self._flask_client = None
+
+    def data_manager(self, rows: int):
+        if rows not in self._managers:
+            from data_utils import SecureDataManager
+            from synthetic_data import SyntheticDataGenerator
+
+            manager = SecureDataManager(os.path.join(self.workdir, f'verifications_{rows}.db'))
+            started = time.perf_counter()
+            SyntheticDataGenerator(seed=self.seed).populate(manager, verifications=rows)
+            print(f"  populated {rows:,} rows in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            self._managers[rows] = manager
+        return self._managers[rows]
+
+    def flask_client(self):
+        if self._flask_client is None:
+            os.environ['DATABASE_PATH'] = os.path.join(self.workdir, 'painease_bench.db')
+            from flask_app import create_app
+
+            app = create_app({'DATABASE_PATH': os.environ['DATABASE_PATH'],
+                              'PRELOAD_SHARED_DATA': False, 'TESTING': True})
+            self._flask_client = app.test_client()
+        return self._flask_client
+
+
+@benchmark('store_verification', params='rows')
+def bench_store_verification(ctx, rows):
+    manager = ctx.data_manager(rows)
+    record = {
+        'patient_id': '9001015009087',
+        'document_type': 'South African ID',
+        'category': 'citizen',
+        'eligibility': 'free_care',
+        'confidence': 92,
+        'document_valid': True,
+        'red_flags': [],
+    }
+    return lambda: manager.store_verification(record)
+
+
+@benchmark('get_analytics_data', params='rows')
+def bench_get_analytics_data(ctx, rows):
+    manager = ctx.data_manager(rows)
+    return lambda: manager.get_analytics_data(30)
+
+
+@benchmark('generate_fraud_report', params='rows')
+def bench_generate_fraud_report(ctx, rows):
+    from data_utils import ReportGenerator
+
+    reports = ReportGenerator(ctx.data_manager(rows))
+    return lambda: reports.generate_fraud_report(30)
+
+
+@benchmark('cached_analytics', params='rows')
+def bench_cached_analytics(ctx, rows):
+    from verification_cache import VerificationColumnCache
+
+    cache = VerificationColumnCache(ctx.data_manager(rows))
+    cache.refresh()
+    return lambda: cache.analytics(30)
+
+
+@benchmark('cached_fraud_report', params='rows')
+def bench_cached_fraud_report(ctx, rows):
+    from data_utils import ReportGenerator
+    from verification_cache import VerificationColumnCache
+
+    manager = ctx.data_manager(rows)
+    cache = VerificationColumnCache(manager)
+    cache.refresh()
+    reports = ReportGenerator(manager, cache=cache)
+    return lambda: reports.generate_fraud_report(30)
+
+
+@benchmark('verify_document', params=IMAGE_SIZES)
+def bench_verify_document(ctx, size):
+    from PIL import Image
+    from ai_verification import DocumentVerifier
+
+    width, height = map(int, size.split('x'))
+    rng = np.random.default_rng(ctx.seed)
+    image = Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+    verifier = DocumentVerifier(rng=np.random.default_rng(ctx.seed), seed_from_image=True)
+    return lambda: verifier.verify_document(image, 'South African ID')
+
+
+@benchmark('verify_upload_jpeg', params=IMAGE_SIZES)
+def bench_verify_upload_jpeg(ctx, size):
+    from PIL import Image
+    from ai_verification import DocumentVerifier
+
+    width, height = map(int, size.split('x'))
+    rng = np.random.default_rng(ctx.seed)
+    path = os.path.join(ctx.workdir, f'upload_{size}.jpg')
+    Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8)).save(path, quality=85)
+    verifier = DocumentVerifier(rng=np.random.default_rng(ctx.seed), seed_from_image=True)
+    return lambda: verifier.verify_upload(path, 'South African ID')
+
+
+@benchmark('validate_sa_id')
+def bench_validate_sa_id(ctx, _):
+    from ai_verification import DocumentVerifier
+    from synthetic_data import SyntheticDataGenerator
+
+    verifier = DocumentVerifier()
+    id_number = str(SyntheticDataGenerator(seed=ctx.seed, patients=1).patient_ids[0])
+    assert verifier.validate_sa_id(id_number)[0]
+    return lambda: verifier.validate_sa_id(id_number)
+
+
+@benchmark('calculate_estimated_cost')
+def bench_calculate_estimated_cost(ctx, _):
+    from ai_verification import EligibilityEngine
+
+    engine = EligibilityEngine()
+    services = ['emergency_care', 'primary_healthcare', 'specialist_consultation', 'chronic_medication']
+    return lambda: engine.calculate_estimated_cost(services, 'legal_immigrant')
+
+
+@benchmark('flask_assess_pain')
+def bench_flask_assess_pain(ctx, _):
+    client = ctx.flask_client()
+    payload = {'pain_level': 5, 'pain_type': 'dull', 'location': 'back',
+               'duration': '1-6h', 'symptoms': ['nausea']}
+    return lambda: client.post('/api/assess_pain', json=payload)
+
+
+def measure(func, min_time: float, repeat: int) -> dict:
+    """Per-call timings over ``repeat`` batches of at least ``min_time`` seconds"""
+    func()  # warm-up
+
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number)
+
+    return {
+        'median_s': statistics.median(samples),
+        'min_s': min(samples),
+        'mean_s': statistics.fmean(samples),
+        'stdev_s': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def run(rows, min_time: float, repeat: int, seed: int, keyword: str = None) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        ctx = BenchContext(workdir, seed)
+        for name, func, params in BENCHMARKS:
+            for param in (rows if params == 'rows' else params):
+                key = name if param is None else f'{name}[{param}]'
+                if keyword and keyword not in key:
+                    continue
+                print(f"{key} ...", file=sys.stderr)
+                results[key] = measure(func(ctx, param), min_time, repeat)
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Print current vs baseline medians; return the names that regressed"""
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            print(f"{key:<40} {'-':>12} {_format_seconds(current['median_s']):>12} {'new':>7}")
+            continue
+        ratio = current['median_s'] / previous['median_s']
+        marker = ''
+        if ratio > 1 + threshold:
+            regressions.append(key)
+            marker = '  REGRESSION'
+        elif ratio < 1 - threshold:
+            marker = '  faster'
+        print(f"{key:<40} {_format_seconds(previous['median_s']):>12} "
+              f"{_format_seconds(current['median_s']):>12} {ratio:>6.2f}x{marker}")
+    return regressions
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 1000000],
+                        help='row counts for the storage benchmarks')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per timed batch')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('-k', dest='keyword', help='only run benchmarks whose name contains this')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    parser.add_argument('--save-baseline', help='write results as the new baseline')
+    parser.add_argument('--compare', help='baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed median slowdown before a regression is reported')
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'rows': args.rows,
+            'seed': args.seed,
+        },
+        'results': run(args.rows, args.min_time, args.repeat, args.seed, args.keyword),
+    }
+
+    print(f"\n{'benchmark':<40} {'median':>12} {'min':>12} {'runs':>10}")
+    for key, row in report['results'].items():
+        print(f"{key:<40} {_format_seconds(row['median_s']):>12} "
+              f"{_format_seconds(row['min_s']):>12} {row['number'] * row['repeat']:>10}")
+
+    for path in filter(None, (args.json_path, args.save_baseline)):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(report['results'], baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
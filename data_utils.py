@@ -3,21 +3,110 @@ Data Management Utilities for HealthVerify Patient Eligibility System
 Handles data storage, retrieval, and privacy compliance
 """
 
-import pandas as pd
+from __future__ import annotations
+
+import base64
+import bisect
 import json
-import sqlite3
-from datetime import datetime, timedelta
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional
-import hashlib
 import uuid
 from pathlib import Path
-import numpy as np
+
+from instrumentation import INSTRUMENTATION
+from lazy_imports import lazy_import
+from pseudonymization import PatientPseudonymizer
+from report_queries import execute_report, read_report
+from storage_backends import SQLiteBackend, StorageBackend
+
+# Only the reporting and bulk-load paths need these
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+def _timed_db(method):
+    """Time the call through the shared instrumentation registry"""
+    return INSTRUMENTATION.timed(f"db.{method.__name__}_ms")(method)
+
+# Tables the synthetic data generator may stream into
+BULK_INSERT_TABLES = ('verifications', 'audit_log', 'pain_assessments')
+
+# Upper bounds (minutes) of the relief session length histogram; the last bucket is open-ended
+SESSION_MINUTE_BOUNDS = (0.5, 1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 30, 45, 60, 90, 120)
+
+# Per-minute event counts behind the live rolling windows are kept this long
+LIVE_BUCKET_RETENTION = timedelta(days=7)
+
+# Columns read back by the verification history queries, in _verification_from_row order
+VERIFICATION_COLUMNS = (
+    'id, document_type, category, eligibility, confidence, '
+    'document_valid, red_flags, created_timestamp'
+)
+
+def _verification_from_row(row, decode_red_flags: bool = True) -> Dict:
+    if decode_red_flags:
+        red_flags = json.loads(row[6]) if row[6] else []
+    else:
+        red_flags = row[6] or '[]'
+    return {
+        'id': row[0],
+        'document_type': row[1],
+        'category': row[2],
+        'eligibility': row[3],
+        'confidence': row[4],
+        'document_valid': bool(row[5]),
+        'red_flags': red_flags,
+        'created_timestamp': row[7]
+    }
+
+def _encode_cursor(created_timestamp: str, verification_id: str) -> str:
+    """Opaque page cursor for the (created_timestamp, id) keyset"""
+    raw = json.dumps([created_timestamp, verification_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def _decode_cursor(cursor: str):
+    try:
+        created_timestamp, verification_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return created_timestamp, verification_id
+
+def _add_missing_columns(backend: StorageBackend, conn, table: str, columns: Dict[str, str]):
+    """ALTER an existing table to add columns introduced after it was created"""
+    existing = backend.table_columns(conn, table)
+    for name, definition in columns.items():
+        if name not in existing:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+
+def _days_ago(days: int) -> str:
+    """UTC date ``days`` ago, the cut-off SQLite's date('now', '-N days') gives"""
+    return (datetime.now(timezone.utc).date() - timedelta(days=days)).isoformat()
+
+def _session_metric(duration_seconds: float) -> str:
+    """live_metric_totals row counting sessions in this duration's histogram bucket"""
+    return f"session_minutes:{bisect.bisect_left(SESSION_MINUTE_BOUNDS, duration_seconds / 60)}"
+
+def _as_timestamp(value) -> str:
+    """ISO timestamp for a datetime, ISO string or None (now)"""
+    if value is None:
+        return datetime.now().isoformat()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
 
 class SecureDataManager:
-    """Privacy-compliant data management system"""
+    """Privacy-compliant data management system
     
-    def __init__(self, db_path: str = "healthcare_data.db"):
-        self.db_path = db_path
+    Storage goes through a StorageBackend: by default a SQLite file at
+    ``db_path``; pass ``backend=PostgresBackend(dsn)`` for a server database.
+    """
+    
+    def __init__(self, db_path: str = "healthcare_data.db",
+                 pseudonymizer: PatientPseudonymizer = None,
+                 backend: StorageBackend = None):
+        self.backend = backend or SQLiteBackend(db_path)
+        self.db_path = getattr(self.backend, 'path', None)
+        self.pseudonymizer = pseudonymizer or PatientPseudonymizer()
         self.init_database()
         
                 # Privacy compliance settings
@@ -26,15 +115,17 @@ class SecureDataManager:
         self.audit_logging = True
     
     def init_database(self):
-        """Initialize SQLite database with required tables"""
-        conn = sqlite3.connect(self.db_path)
+        """Initialize the database with required tables"""
+        conn = self.backend.connect()
         cursor = conn.cursor()
         
+        self.backend.prepare_schema(conn)
+        
         # Verifications table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS verifications (
             id TEXT PRIMARY KEY,
-            patient_id_hash TEXT NOT NULL,
+            patient_id_hash BLOB NOT NULL,
             document_type TEXT NOT NULL,
             category TEXT NOT NULL,
             eligibility TEXT NOT NULL,
@@ -52,7 +143,7 @@ class SecureDataManager:
             id TEXT PRIMARY KEY,
             action TEXT NOT NULL,
             user_id TEXT,
-            patient_id_hash TEXT,
+            patient_id_hash BLOB,
             timestamp TEXT NOT NULL,
             ip_address TEXT,
             details TEXT
@@ -69,6 +160,23 @@ class SecureDataManager:
         )
         ''')
         
+        # Downsampled system metrics, one row per metric and bucket
+        for rollup_table in ('system_metrics_1m', 'system_metrics_1h', 'system_metrics_1d'):
+            cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {rollup_table} (
+                metric_name TEXT NOT NULL,
+                bucket_start INTEGER NOT NULL,
+                sample_count INTEGER NOT NULL,
+                value_sum REAL NOT NULL,
+                value_min REAL NOT NULL,
+                value_max REAL NOT NULL,
+                PRIMARY KEY (metric_name, bucket_start)
+            )
+            ''')
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{rollup_table}_bucket ON {rollup_table} (bucket_start)')
+        
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_system_metrics_timestamp ON system_metrics (timestamp)')
+        
         # Alerts table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS alerts (
@@ -77,19 +185,215 @@ class SecureDataManager:
             severity TEXT NOT NULL,
             message TEXT NOT NULL,
             resolved BOOLEAN DEFAULT FALSE,
+            created_timestamp TEXT NOT NULL,
+            occurrence_count INTEGER NOT NULL DEFAULT 1,
+            last_seen_timestamp TEXT,
+            resolved_timestamp TEXT,
+            resolved_by TEXT
+        )
+        ''')
+        _add_missing_columns(self.backend, conn, 'alerts', {
+            'occurrence_count': 'INTEGER NOT NULL DEFAULT 1',
+            'last_seen_timestamp': 'TEXT',
+            'resolved_timestamp': 'TEXT',
+            'resolved_by': 'TEXT'
+        })
+        
+        # Partial indexes: only open alerts are listed or deduplicated against
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_unresolved ON alerts (created_timestamp) WHERE resolved = FALSE')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_dedup ON alerts (alert_type, message, last_seen_timestamp) WHERE resolved = FALSE')
+        
+        # Pain assessments submitted through the web APIs
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS pain_assessments (
+            id TEXT PRIMARY KEY,
+            session_id TEXT,
+            pain_level INTEGER NOT NULL,
+            pain_type TEXT,
+            location TEXT,
+            duration TEXT,
+            symptoms TEXT,
+            is_emergency BOOLEAN NOT NULL,
+            created_timestamp TEXT NOT NULL
+        )
+        ''')
+        
+        # Pain level updates recorded against an assessment
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS pain_progress (
+            id TEXT PRIMARY KEY,
+            assessment_id TEXT NOT NULL,
+            original_pain INTEGER NOT NULL,
+            current_pain INTEGER NOT NULL,
+            improvement INTEGER NOT NULL,
             created_timestamp TEXT NOT NULL
         )
         ''')
         
+        # Completed relief technique sessions (append-only)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS relief_sessions (
+            id TEXT PRIMARY KEY,
+            session_id TEXT,
+            technique TEXT NOT NULL,
+            before_pain INTEGER NOT NULL,
+            after_pain INTEGER NOT NULL,
+            improvement INTEGER NOT NULL,
+            duration_seconds REAL,
+            completed BOOLEAN NOT NULL,
+            started_timestamp TEXT,
+            created_timestamp TEXT NOT NULL
+        )
+        ''')
+        
+        # Bumped in the same transaction whenever rows are deleted or
+        # back-filled, so caches that only append newer rows
+        # (VerificationColumnCache) rebuild whichever process made the change
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_generations (
+            table_name TEXT PRIMARY KEY,
+            generation INTEGER NOT NULL
+        )
+        ''')
+        
+        # Running per-technique totals, maintained on every session insert
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS technique_effectiveness (
+            technique TEXT PRIMARY KEY,
+            session_count INTEGER NOT NULL,
+            total_improvement INTEGER NOT NULL,
+            improved_count INTEGER NOT NULL,
+            updated_timestamp TEXT NOT NULL
+        )
+        ''')
+        
+        # Running dashboard totals, updated in the same transaction as every
+        # assessment, pain update and relief session so all workers agree
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS live_metric_totals (
+            metric_name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+        ''')
+        
+        # Event counts per minute ('YYYY-MM-DDTHH:MM') for the rolling windows
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS live_metric_buckets (
+            metric_name TEXT NOT NULL,
+            bucket_minute TEXT NOT NULL,
+            event_count INTEGER NOT NULL,
+            PRIMARY KEY (metric_name, bucket_minute)
+        )
+        ''')
+        
+        # Per-patient history in time order; 32-byte BLOB pseudonyms keep it
+        # half the size of a hex-text index
+        cursor.execute('DROP INDEX IF EXISTS idx_verifications_patient')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_verifications_patient_created ON verifications (patient_id_hash, created_timestamp)')
+        
+        # Keyset pagination over the full history
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_verifications_created ON verifications (created_timestamp, id)')
+        
+        # Covering index for the report_queries date-window aggregates, which
+        # then never touch the table rows
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_verifications_report ON verifications (created_timestamp, category, confidence, document_valid)')
+
+        # Retention: the compliance report and cleanup_expired_data
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_verifications_expiry ON verifications (expiry_date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_audit_log_timestamp ON audit_log (timestamp)')
+
+        # Indexes for the analytics queries
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pain_assessments_session ON pain_assessments (session_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pain_assessments_created ON pain_assessments (created_timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pain_progress_assessment ON pain_progress (assessment_id, created_timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pain_progress_created ON pain_progress (created_timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_relief_sessions_session ON relief_sessions (session_id, created_timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_relief_sessions_created ON relief_sessions (created_timestamp)')
+        
+        # Databases created before the live totals existed get them from history once
+        if cursor.execute('SELECT COUNT(*) FROM live_metric_totals').fetchone()[0] == 0:
+            self.rebuild_live_metrics(conn)
+        
         conn.commit()
         conn.close()
     
-    def hash_patient_id(self, patient_id: str) -> str:
-        """Hash patient ID for privacy protection"""
-        # Use SHA-256 with salt for patient ID hashing
-        salt = "healthverify_2024"  # In production, use environment variable
-        return hashlib.sha256(f"{patient_id}{salt}".encode()).hexdigest()
+    def table_generation(self, table: str) -> int:
+        """Current generation of ``table``; changes on deletes and back-fills"""
+        conn = self.backend.connect()
+        row = conn.execute('SELECT generation FROM table_generations WHERE table_name = ?',
+                           (table,)).fetchone()
+        conn.close()
+        return row[0] if row else 0
+    
+    @staticmethod
+    def bump_generation(conn, table: str):
+        """Mark ``table`` as rewritten; call inside the deleting transaction"""
+        conn.execute('''
+        INSERT INTO table_generations (table_name, generation) VALUES (?, 1)
+        ON CONFLICT(table_name) DO UPDATE SET generation = table_generations.generation + 1
+        ''', (table,))
+    
+    @staticmethod
+    def add_live_metrics(conn, totals: Dict[str, int], events: Dict[str, List[str]] = None):
+        """Add to the running dashboard totals; call inside the writing transaction
+        
+        ``events`` maps a windowed counter to the ISO timestamps of its new
+        events, which are counted into per-minute buckets.
+        """
+        conn.executemany('''
+        INSERT INTO live_metric_totals (metric_name, value) VALUES (?, ?)
+        ON CONFLICT(metric_name) DO UPDATE SET value = live_metric_totals.value + excluded.value
+        ''', list(totals.items()))
+        
+        oldest = (datetime.now() - LIVE_BUCKET_RETENTION).isoformat()
+        for metric, timestamps in (events or {}).items():
+            minutes = Counter(timestamp[:16] for timestamp in timestamps if timestamp >= oldest)
+            conn.executemany('''
+            INSERT INTO live_metric_buckets (metric_name, bucket_minute, event_count) VALUES (?, ?, ?)
+            ON CONFLICT(metric_name, bucket_minute) DO UPDATE SET
+                event_count = live_metric_buckets.event_count + excluded.event_count
+            ''', [(metric, minute, count) for minute, count in minutes.items()])
+    
+    @staticmethod
+    def rebuild_live_metrics(conn):
+        """Recompute the running dashboard totals from the stored history"""
+        conn.execute('DELETE FROM live_metric_totals')
+        conn.execute('DELETE FROM live_metric_buckets')
+        
+        totals = dict.fromkeys(('assessments', 'outcomes', 'improvement_sum', 'improved'), 0)
+        totals['assessments'] = conn.execute('SELECT COUNT(*) FROM pain_assessments').fetchone()[0]
+        outcomes, improvement_sum, improved = conn.execute('''
+        SELECT COUNT(*), COALESCE(SUM(improvement), 0),
+               COALESCE(SUM(CASE WHEN improvement > 0 THEN 1 ELSE 0 END), 0)
+        FROM (
+            SELECT improvement FROM pain_progress
+            UNION ALL
+            SELECT improvement FROM relief_sessions
+        ) outcomes
+        ''').fetchone()
+        totals.update(outcomes=outcomes, improvement_sum=int(improvement_sum), improved=int(improved))
+        durations = conn.execute(
+            'SELECT duration_seconds FROM relief_sessions WHERE duration_seconds IS NOT NULL').fetchall()
+        totals.update(Counter(_session_metric(duration) for (duration,) in durations))
+        
+        oldest = (datetime.now() - LIVE_BUCKET_RETENTION).isoformat()
+        events = {
+            'assessments': conn.execute(
+                'SELECT created_timestamp FROM pain_assessments WHERE created_timestamp >= ?', (oldest,)).fetchall(),
+            'outcomes': conn.execute('''
+            SELECT created_timestamp FROM pain_progress WHERE created_timestamp >= ?
+            UNION ALL
+            SELECT created_timestamp FROM relief_sessions WHERE created_timestamp >= ?
+            ''', (oldest, oldest)).fetchall(),
+        }
+        SecureDataManager.add_live_metrics(
+            conn, totals, {metric: [row[0] for row in rows] for metric, rows in events.items()})
+    
+    def hash_patient_id(self, patient_id: str) -> bytes:
+        """Keyed pseudonym of a patient ID for privacy protection"""
+        return self.pseudonymizer.pseudonymize(patient_id)
 
+    @_timed_db
     def store_verification(self, verification_data: Dict) -> str:
         """Store verification result with privacy compliance"""
         verification_id = str(uuid.uuid4())
@@ -100,7 +404,7 @@ class SecureDataManager:
         # Calculate expiry date (7 years from now)
         expiry_date = (datetime.now() + timedelta(days=self.data_retention_days)).isoformat()
         
-        conn = sqlite3.connect(self.db_path)
+        conn = self.backend.connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -131,81 +435,133 @@ class SecureDataManager:
     
     def get_verification_history(self, limit: int = 100) -> List[Dict]:
         """Retrieve verification history (anonymized)"""
-        conn = sqlite3.connect(self.db_path)
+        return self.get_verification_page(limit)['verifications']
+    
+    @_timed_db
+    def get_verification_page(self, limit: int = 100, cursor: str = None,
+                              decode_red_flags: bool = True) -> Dict:
+        """One page of verification history, newest first
+        
+        Pass the returned ``next_cursor`` back to get the following page; it
+        is None on the last page. Each page is an index seek on
+        (created_timestamp, id), so deep pages cost the same as the first.
+        With ``decode_red_flags=False`` red_flags stay as their JSON text.
+        """
+        if limit < 0:
+            raise ValueError(f"limit must be non-negative, got {limit}")
+        if limit == 0:
+            return {'verifications': [], 'next_cursor': None}
+        
+        conn = self.backend.connect()
+        db_cursor = conn.cursor()
+        
+        # One extra row tells us whether another page exists
+        if cursor is None:
+            db_cursor.execute(f'''
+            SELECT {VERIFICATION_COLUMNS}
+            FROM verifications 
+            ORDER BY created_timestamp DESC, id DESC 
+            LIMIT ?
+            ''', (limit + 1,))
+        else:
+            db_cursor.execute(f'''
+            SELECT {VERIFICATION_COLUMNS}
+            FROM verifications 
+            WHERE (created_timestamp, id) < (?, ?)
+            ORDER BY created_timestamp DESC, id DESC 
+            LIMIT ?
+            ''', (*_decode_cursor(cursor), limit + 1))
+        
+        results = db_cursor.fetchall()
+        conn.close()
+        
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            last = results[-1]
+            next_cursor = _encode_cursor(last[7], last[0])
+        
+        return {
+            'verifications': [_verification_from_row(row, decode_red_flags) for row in results],
+            'next_cursor': next_cursor
+        }
+    
+    def iter_verifications(self, page_size: int = 1000, decode_red_flags: bool = False):
+        """Walk the full history newest first, holding one page at a time"""
+        if page_size < 1:
+            raise ValueError(f"page_size must be positive, got {page_size}")
+        cursor = None
+        while True:
+            page = self.get_verification_page(page_size, cursor, decode_red_flags)
+            yield from page['verifications']
+            cursor = page['next_cursor']
+            if cursor is None:
+                return
+    
+    @_timed_db
+    def get_patient_history(self, patient_id: str, limit: int = 20) -> List[Dict]:
+        """A patient's prior verifications, newest first"""
+        patient_id_hash = self.hash_patient_id(patient_id)
+        
+        conn = self.backend.connect()
         cursor = conn.cursor()
         
-        cursor.execute('''
-        SELECT id, document_type, category, eligibility, confidence, 
-               document_valid, red_flags, created_timestamp
+        # Served entirely from idx_verifications_patient_created
+        cursor.execute(f'''
+        SELECT {VERIFICATION_COLUMNS}
         FROM verifications 
+        WHERE patient_id_hash = ?
         ORDER BY created_timestamp DESC 
         LIMIT ?
-        ''', (limit,))
+        ''', (patient_id_hash, limit))
         
         results = cursor.fetchall()
         conn.close()
         
-        # Convert to list of dictionaries
-        verifications = []
-        for row in results:
-            verification = {
-                'id': row[0],
-                'document_type': row[1],
-                'category': row[2],
-                'eligibility': row[3],
-                'confidence': row[4],
-                'document_valid': bool(row[5]),
-                'red_flags': json.loads(row[6]) if row[6] else [],
-                'created_timestamp': row[7]
-            }
-            verifications.append(verification)
+        self.log_action('view_patient_history', patient_id_hash=patient_id_hash)
+        
+        return [_verification_from_row(row) for row in results]
+    
+    @_timed_db
+    def find_reusable_verification(self, patient_id: str, max_age_days: int = 30,
+                                   min_confidence: int = 80) -> Optional[Dict]:
+        """Most recent valid, unflagged verification young enough to reuse"""
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        
+        conn = self.backend.connect()
+        cursor = conn.cursor()
         
-        return verifications
+        cursor.execute(f'''
+        SELECT {VERIFICATION_COLUMNS}
+        FROM verifications 
+        WHERE patient_id_hash = ? AND created_timestamp >= ?
+        AND document_valid = TRUE AND red_flags = '[]' AND confidence >= ?
+        ORDER BY created_timestamp DESC 
+        LIMIT 1
+        ''', (self.hash_patient_id(patient_id), cutoff, min_confidence))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        return _verification_from_row(row) if row else None
     
+    @_timed_db
     def get_analytics_data(self, days: int = 30) -> Dict:
         """Get analytics data for dashboard"""
-        conn = sqlite3.connect(self.db_path)
+        since = (_days_ago(days),)
+        conn = self.backend.reader()
         
         # Get verification counts by category
-        category_df = pd.read_sql_query('''
-        SELECT category, COUNT(*) as count
-        FROM verifications 
-        WHERE created_timestamp >= date('now', '-{} days')
-        GROUP BY category
-        '''.format(days), conn)
+        category_df = read_report(self.backend, conn, 'analytics_categories', since)
         
         # Get daily verification trends
-        daily_df = pd.read_sql_query('''
-        SELECT date(created_timestamp) as date, 
-               category,
-               COUNT(*) as count
-        FROM verifications 
-        WHERE created_timestamp >= date('now', '-{} days')
-        GROUP BY date(created_timestamp), category
-        ORDER BY date
-        '''.format(days), conn)
+        daily_df = read_report(self.backend, conn, 'analytics_daily_trends', since)
         
         # Get confidence score distribution
-        confidence_df = pd.read_sql_query('''
-        SELECT 
-            CASE 
-                WHEN confidence >= 90 THEN 'High (90-100%)'
-                WHEN confidence >= 70 THEN 'Medium (70-89%)'
-                ELSE 'Low (<70%)'
-            END as confidence_range,
-            COUNT(*) as count
-        FROM verifications 
-        WHERE created_timestamp >= date('now', '-{} days')
-        GROUP BY confidence_range
-        '''.format(days), conn)
+        confidence_df = read_report(self.backend, conn, 'analytics_confidence', since)
         
         # Get red flags summary
-        red_flags_df = pd.read_sql_query('''
-        SELECT red_flags, COUNT(*) as count
-        FROM verifications 
-        WHERE created_timestamp >= date('now', '-{} days')
-        AND red_flags != '[]'
-        '''.format(days), conn)
+        red_flags_df = read_report(self.backend, conn, 'analytics_red_flags', since)
         
         conn.close()
         
@@ -217,8 +573,251 @@ class SecureDataManager:
             'total_verifications': len(daily_df)
         }
     
+    @_timed_db
+    def store_pain_assessment(self, assessment: Dict, is_emergency: bool, 
+                              session_id: str = '') -> str:
+        """Store a pain assessment submitted through the web APIs"""
+        assessment_id = str(uuid.uuid4())
+        created_timestamp = _as_timestamp(assessment.get('timestamp'))
+        
+        conn = self.backend.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        INSERT INTO pain_assessments 
+        (id, session_id, pain_level, pain_type, location, duration, 
+         symptoms, is_emergency, created_timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            assessment_id,
+            session_id,
+            assessment.get('level', 5),
+            assessment.get('type', ''),
+            assessment.get('location', ''),
+            assessment.get('duration', ''),
+            json.dumps(assessment.get('symptoms', [])),
+            is_emergency,
+            created_timestamp
+        ))
+        self.add_live_metrics(conn, {'assessments': 1}, {'assessments': [created_timestamp]})
+        
+        conn.commit()
+        conn.close()
+        
+        return assessment_id
+    
+    @_timed_db
+    def record_pain_progress(self, assessment_id: str, current_pain: int) -> Optional[Dict]:
+        """Record an updated pain level against a stored assessment"""
+        conn = self.backend.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT pain_level FROM pain_assessments WHERE id = ?
+        ''', (assessment_id,))
+        row = cursor.fetchone()
+        
+        if row is None:
+            conn.close()
+            return None
+        
+        progress = {
+            'original_pain': row[0],
+            'current_pain': current_pain,
+            'improvement': row[0] - current_pain,
+            'timestamp': datetime.now().isoformat()
+        }
+        
+        cursor.execute('''
+        INSERT INTO pain_progress 
+        (id, assessment_id, original_pain, current_pain, improvement, created_timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (
+            str(uuid.uuid4()),
+            assessment_id,
+            progress['original_pain'],
+            progress['current_pain'],
+            progress['improvement'],
+            progress['timestamp']
+        ))
+        self.add_live_metrics(conn, {
+            'outcomes': 1,
+            'improvement_sum': progress['improvement'],
+            'improved': int(progress['improvement'] > 0)
+        }, {'outcomes': [progress['timestamp']]})
+        
+        conn.commit()
+        conn.close()
+        
+        return progress
+    
+    @_timed_db
+    def record_relief_session(self, relief_session: Dict, session_id: str = '') -> str:
+        """Append a completed relief session and update its technique totals"""
+        record_id = str(uuid.uuid4())
+        before_pain = relief_session.get('before_pain', 5)
+        after_pain = relief_session.get('after_pain', 5)
+        improvement = before_pain - after_pain
+        
+        started = relief_session.get('started_at')
+        ended = relief_session.get('ended_at') or datetime.now()
+        duration = (ended - started).total_seconds() if started else None
+        created_timestamp = _as_timestamp(ended)
+        
+        conn = self.backend.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        INSERT INTO relief_sessions 
+        (id, session_id, technique, before_pain, after_pain, improvement, 
+         duration_seconds, completed, started_timestamp, created_timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            record_id,
+            session_id,
+            relief_session.get('technique', ''),
+            before_pain,
+            after_pain,
+            improvement,
+            duration,
+            relief_session.get('completed', True),
+            _as_timestamp(started) if started else None,
+            created_timestamp
+        ))
+        
+        cursor.execute('''
+        INSERT INTO technique_effectiveness 
+        (technique, session_count, total_improvement, improved_count, updated_timestamp)
+        VALUES (?, 1, ?, ?, ?)
+        ON CONFLICT(technique) DO UPDATE SET
+            session_count = technique_effectiveness.session_count + 1,
+            total_improvement = technique_effectiveness.total_improvement + excluded.total_improvement,
+            improved_count = technique_effectiveness.improved_count + excluded.improved_count,
+            updated_timestamp = excluded.updated_timestamp
+        ''', (
+            relief_session.get('technique', ''),
+            improvement,
+            int(improvement > 0),
+            created_timestamp
+        ))
+        
+        totals = {'outcomes': 1, 'improvement_sum': improvement, 'improved': int(improvement > 0)}
+        if duration is not None:
+            totals[_session_metric(duration)] = 1
+        self.add_live_metrics(conn, totals, {'outcomes': [created_timestamp]})
+        
+        conn.commit()
+        conn.close()
+        
+        return record_id
+    
+    @_timed_db
+    def get_technique_effectiveness(self) -> List[Dict]:
+        """Per-technique effectiveness from the precomputed totals"""
+        conn = self.backend.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT technique, session_count, total_improvement, improved_count
+        FROM technique_effectiveness
+        ORDER BY technique
+        ''')
+        
+        results = cursor.fetchall()
+        conn.close()
+        
+        return [{
+            'technique': row[0],
+            'sessions': row[1],
+            'avg_improvement': row[2] / row[1],
+            'success_rate': row[3] / row[1] * 100
+        } for row in results]
+    
+    @_timed_db
+    def get_pain_progress(self, session_id: str, limit: int = 500) -> List[Dict]:
+        """Pain updates recorded against one session's assessments, oldest first"""
+        conn = self.backend.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT p.original_pain, p.current_pain, p.improvement, p.created_timestamp
+        FROM pain_assessments a
+        JOIN pain_progress p ON p.assessment_id = a.id
+        WHERE a.session_id = ?
+        ORDER BY p.created_timestamp DESC
+        LIMIT ?
+        ''', (session_id, limit))
+        
+        results = cursor.fetchall()
+        conn.close()
+        
+        return [{
+            'original_pain': row[0],
+            'current_pain': row[1],
+            'improvement': row[2],
+            'timestamp': row[3]
+        } for row in reversed(results)]
+    
+    @_timed_db
+    def get_pain_progress_summary(self, days: int = 30) -> Dict:
+        """Facility-wide pain update aggregates over the last ``days`` days"""
+        since = (datetime.now() - timedelta(days=days)).isoformat()
+        
+        conn = self.backend.reader()
+        count, avg_improvement, improved = execute_report(
+            self.backend, conn, 'pain_progress_summary', (since,)).fetchone()
+        conn.close()
+        
+        return {
+            'updates': count,
+            'avg_improvement': float(avg_improvement or 0.0),
+            'success_rate': (improved or 0) / count * 100 if count else 0.0
+        }
+    
+    @_timed_db
+    def get_live_metrics(self, window_seconds: int = 86400) -> Dict:
+        """Running dashboard totals plus event counts over the last ``window_seconds``
+        
+        Reads the precomputed live_metric_* rows only, however long the
+        history is. ``session_minute_counts`` holds one count per
+        SESSION_MINUTE_BOUNDS bucket, plus the open-ended last bucket.
+        """
+        since = (datetime.now() - timedelta(seconds=window_seconds)).isoformat()[:16]
+        
+        conn = self.backend.reader()
+        totals = dict(conn.execute('SELECT metric_name, value FROM live_metric_totals').fetchall())
+        recent = dict(conn.execute('''
+        SELECT metric_name, SUM(event_count) FROM live_metric_buckets
+        WHERE metric_name IN ('assessments', 'outcomes') AND bucket_minute >= ?
+        GROUP BY metric_name
+        ''', (since,)).fetchall())
+        conn.close()
+        
+        return {
+            'assessments_total': totals.get('assessments', 0),
+            'assessments_recent': int(recent.get('assessments') or 0),
+            'outcomes_total': totals.get('outcomes', 0),
+            'outcomes_recent': int(recent.get('outcomes') or 0),
+            'improvement_sum': totals.get('improvement_sum', 0),
+            'improved_total': totals.get('improved', 0),
+            'session_minute_counts': [totals.get(f"session_minutes:{index}", 0)
+                                      for index in range(len(SESSION_MINUTE_BOUNDS) + 1)]
+        }
+    
+    @_timed_db
+    def get_hourly_session_counts(self, day: str) -> List[int]:
+        """Relief sessions completed in each hour (0-23) of ``day`` (YYYY-MM-DD)"""
+        end = (datetime.fromisoformat(day) + timedelta(days=1)).date().isoformat()
+        
+        conn = self.backend.reader()
+        counts = dict(execute_report(self.backend, conn, 'relief_sessions_by_hour', (day, end)).fetchall())
+        conn.close()
+        
+        return [counts.get(f"{hour:02d}", 0) for hour in range(24)]
+    
+    @_timed_db
     def log_action(self, action: str, user_id: str = 'system', 
-                   patient_id_hash: str = '', ip_address: str = '', 
+                   patient_id_hash: Optional[bytes] = None, ip_address: str = '', 
                    details: str = ''):
         """Log user actions for audit trail"""
         if not self.audit_logging:
@@ -226,7 +825,7 @@ class SecureDataManager:
         
         log_id = str(uuid.uuid4())
         
-        conn = sqlite3.connect(self.db_path)
+        conn = self.backend.connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -246,36 +845,102 @@ class SecureDataManager:
         conn.commit()
         conn.close()
     
-    def create_alert(self, alert_type: str, severity: str, message: str):
-        """Create system alert"""
-        alert_id = str(uuid.uuid4())
-        
-        conn = sqlite3.connect(self.db_path)
+    @_timed_db
+    def create_alert(self, alert_type: str, severity: str, message: str,
+                     dedup_window_seconds: int = 3600):
+        """Create system alert
+        
+        A repeat of an open alert (same type and message) seen within
+        ``dedup_window_seconds`` bumps its occurrence count instead of
+        adding a row; the existing alert's id is returned.
+        """
+        now = datetime.now()
+        window_start = (now - timedelta(seconds=dedup_window_seconds)).isoformat()
+        
+        conn = self.backend.connect()
         cursor = conn.cursor()
+        self.backend.begin_write(conn, 'alerts')
         
         cursor.execute('''
-        INSERT INTO alerts (id, alert_type, severity, message, created_timestamp)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (
-            alert_id,
-            alert_type,
-            severity,
-            message,
-            datetime.now().isoformat()
-        ))
+        SELECT id FROM alerts
+        WHERE resolved = FALSE AND alert_type = ? AND message = ?
+        AND last_seen_timestamp >= ?
+        ORDER BY last_seen_timestamp DESC
+        LIMIT 1
+        ''', (alert_type, message, window_start))
+        existing = cursor.fetchone()
+        
+        if existing:
+            alert_id = existing[0]
+            cursor.execute('''
+            UPDATE alerts
+            SET occurrence_count = occurrence_count + 1, last_seen_timestamp = ?
+            WHERE id = ?
+            ''', (now.isoformat(), alert_id))
+        else:
+            alert_id = str(uuid.uuid4())
+            cursor.execute('''
+            INSERT INTO alerts (id, alert_type, severity, message, created_timestamp, last_seen_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                alert_id,
+                alert_type,
+                severity,
+                message,
+                now.isoformat(),
+                now.isoformat()
+            ))
         
         conn.commit()
         conn.close()
         
         return alert_id
     
+    def resolve_alert(self, alert_id: str, resolved_by: str = 'system') -> bool:
+        """Mark one alert resolved; False if it was not open"""
+        return self.resolve_alerts([alert_id], resolved_by=resolved_by) == 1
+    
+    def resolve_alerts(self, alert_ids: List[str] = None, alert_type: str = None,
+                       resolved_by: str = 'system') -> int:
+        """Resolve the given alerts, or every open alert of ``alert_type``"""
+        if alert_ids is None and alert_type is None:
+            raise ValueError("Pass alert_ids or alert_type")
+        
+        conn = self.backend.connect()
+        cursor = conn.cursor()
+        
+        resolved_at = datetime.now().isoformat()
+        if alert_ids is not None:
+            cursor.executemany('''
+            UPDATE alerts SET resolved = TRUE, resolved_timestamp = ?, resolved_by = ?
+            WHERE id = ? AND resolved = FALSE
+            ''', [(resolved_at, resolved_by, alert_id) for alert_id in alert_ids])
+        else:
+            cursor.execute('''
+            UPDATE alerts SET resolved = TRUE, resolved_timestamp = ?, resolved_by = ?
+            WHERE alert_type = ? AND resolved = FALSE
+            ''', (resolved_at, resolved_by, alert_type))
+        resolved_count = cursor.rowcount
+        
+        conn.commit()
+        conn.close()
+        
+        if resolved_count:
+            self.log_action('resolve_alerts', user_id=resolved_by,
+                            details=f"Resolved {resolved_count} alert(s)")
+        
+        return resolved_count
+    
+    @_timed_db
     def get_active_alerts(self) -> List[Dict]:
         """Get unresolved alerts"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.backend.connect()
         cursor = conn.cursor()
         
+        # Walks idx_alerts_unresolved, which holds open alerts only
         cursor.execute('''
-        SELECT id, alert_type, severity, message, created_timestamp
+        SELECT id, alert_type, severity, message, created_timestamp,
+               occurrence_count, last_seen_timestamp
         FROM alerts 
         WHERE resolved = FALSE 
         ORDER BY created_timestamp DESC
@@ -291,7 +956,9 @@ class SecureDataManager:
                 'type': row[1],
                 'severity': row[2],
                 'message': row[3],
-                'timestamp': row[4]
+                'timestamp': row[4],
+                'occurrences': row[5],
+                'last_seen': row[6]
             }
             alerts.append(alert)
         
@@ -299,7 +966,7 @@ class SecureDataManager:
     
     def cleanup_expired_data(self):
         """Remove data that has exceeded retention period"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.backend.connect()
         cursor = conn.cursor()
         
         # Remove expired verifications
@@ -309,6 +976,8 @@ class SecureDataManager:
         ''', (datetime.now().isoformat(),))
         
         expired_count = cursor.rowcount
+        if expired_count:
+            self.bump_generation(conn, 'verifications')
         
         # Remove old audit logs (keep for 1 year)
         one_year_ago = (datetime.now() - timedelta(days=365)).isoformat()
@@ -319,6 +988,12 @@ class SecureDataManager:
         
         audit_cleaned = cursor.rowcount
         
+        # Minute buckets past every rolling window
+        cursor.execute('''
+        DELETE FROM live_metric_buckets
+        WHERE bucket_minute < ?
+        ''', ((datetime.now() - LIVE_BUCKET_RETENTION).isoformat()[:16],))
+        
         conn.commit()
         conn.close()
         
@@ -326,36 +1001,65 @@ class SecureDataManager:
             'expired_verifications_removed': expired_count,
             'old_audit_logs_removed': audit_cleaned
         }
-    
-    def export_data(self, table: str, format: str = 'csv') -> str:
-        """Export data for reporting (anonymized)"""
-        conn = sqlite3.connect(self.db_path)
+
+    @_timed_db
+    def bulk_insert(self, table: str, batch: Dict[str, np.ndarray]) -> int:
+        """Insert a columnar batch (column name -> array) in one transaction"""
+        if table not in BULK_INSERT_TABLES:
+            raise ValueError(f"Unknown table: {table}")
+
+        columns = list(batch)
+        rows = list(zip(*(np.asarray(batch[column]).tolist() for column in columns)))
+
+        conn = self.backend.connect()
+        self.backend.copy_rows(conn, table, columns, rows)
+        if table == 'verifications':
+            self.bump_generation(conn, table)
+        elif table == 'pain_assessments':
+            self.add_live_metrics(conn, {'assessments': len(rows)},
+                                  {'assessments': [str(ts) for ts in batch['created_timestamp']]})
+        conn.commit()
+        conn.close()
+
+        return len(rows)
+
+    def export_data(self, table: str, format: str = 'csv', batch_size: int = 10000) -> str:
+        """Export data for reporting (anonymized)
         
+        Rows are streamed from the backend (a server-side cursor on
+        PostgreSQL) and CSV exports are written batch by batch.
+        """
         if table == 'verifications':
             # Export verification data without patient identifiers
-            df = pd.read_sql_query('''
+            query = '''
             SELECT id, document_type, category, eligibility, confidence, 
                    document_valid, created_timestamp
             FROM verifications
             ORDER BY created_timestamp DESC
-            ''', conn)
+            '''
         elif table == 'alerts':
-            df = pd.read_sql_query('SELECT * FROM alerts', conn)
+            query = 'SELECT * FROM alerts'
         else:
             raise ValueError(f"Unknown table: {table}")
         
-        conn.close()
+        if format not in ('csv', 'excel'):
+            raise ValueError(f"Unsupported format: {format}")
         
         # Generate filename with timestamp
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"{table}_export_{timestamp}.{format}"
         
+        batches = self.backend.stream(query, batch_size=batch_size)
+        columns = next(batches)
+        frames = (pd.DataFrame.from_records(rows, columns=columns) for rows in batches)
+        
         if format == 'csv':
-            df.to_csv(filename, index=False)
-        elif format == 'excel':
-            df.to_excel(filename, index=False)
+            pd.DataFrame(columns=columns).to_csv(filename, index=False)
+            for df in frames:
+                df.to_csv(filename, mode='a', header=False, index=False)
         else:
-            raise ValueError(f"Unsupported format: {format}")
+            df = pd.concat([pd.DataFrame(columns=columns), *frames], ignore_index=True)
+            df.to_excel(filename, index=False)
         
         # Log the export action
         self.log_action('data_export', details=f"Exported {table} to {filename}")
@@ -363,30 +1067,36 @@ class SecureDataManager:
         return filename
 
 class ReportGenerator:
-    """Generate compliance and analytics reports"""
+    """Generate compliance and analytics reports
+    
+    With a VerificationColumnCache the verification reports run in memory
+    on the cached columns instead of querying SQLite.
+    """
     
-    def __init__(self, data_manager: SecureDataManager):
+    def __init__(self, data_manager: SecureDataManager, cache=None):
         self.data_manager = data_manager
+        self.cache = cache
+    
+    def generate_analytics(self, days: int = 30) -> Dict:
+        """Dashboard analytics, from the cache when there is one"""
+        if self.cache is not None:
+            return self.cache.analytics(days)
+        return self.data_manager.get_analytics_data(days)
     
     def generate_daily_summary(self, date: str = None) -> Dict:
         """Generate daily summary report"""
         if date is None:
             date = datetime.now().strftime('%Y-%m-%d')
         
-        conn = sqlite3.connect(self.data_manager.db_path)
+        if self.cache is not None:
+            return self.cache.daily_summary(date)
+        
+        next_date = (datetime.strptime(date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+        backend = self.data_manager.backend
+        conn = backend.reader()
         
         # Get daily statistics
-        daily_stats = pd.read_sql_query('''
-        SELECT 
-            COUNT(*) as total_verifications,
-            SUM(CASE WHEN category = 'citizen' THEN 1 ELSE 0 END) as citizens,
-            SUM(CASE WHEN category = 'legal_immigrant' THEN 1 ELSE 0 END) as legal_immigrants,
-            SUM(CASE WHEN category = 'undocumented' THEN 1 ELSE 0 END) as undocumented,
-            SUM(CASE WHEN document_valid = 1 THEN 1 ELSE 0 END) as valid_documents,
-            AVG(confidence) as avg_confidence
-        FROM verifications 
-        WHERE date(created_timestamp) = ?
-        ''', conn, params=[date])
+        daily_stats = read_report(backend, conn, 'daily_summary', (date, next_date))
         
         conn.close()
         
@@ -399,17 +1109,16 @@ class ReportGenerator:
         
         return stats
     
-    def generate_fraud_report(self, days: int = 30) -> Dict:
-        """Generate fraud detection report"""
-        conn = sqlite3.connect(self.data_manager.db_path)
+    def generate_fraud_report(self, days: int = 30, top_flags: Optional[int] = 10) -> Dict:
+        """Generate fraud detection report (``top_flags=None`` keeps every flag)"""
+        if self.cache is not None:
+            return self.cache.fraud_report(days, top_flags)
+        
+        backend = self.data_manager.backend
+        conn = backend.reader()
         
         # Get verifications with red flags
-        fraud_data = pd.read_sql_query('''
-        SELECT red_flags, created_timestamp, confidence, category
-        FROM verifications 
-        WHERE created_timestamp >= date('now', '-{} days')
-        AND red_flags != '[]'
-        '''.format(days), conn)
+        fraud_data = read_report(backend, conn, 'fraud_flagged', (_days_ago(days),))
         
         conn.close()
         
@@ -429,7 +1138,7 @@ class ReportGenerator:
         # Count flag frequencies
         from collections import Counter
         flag_counts = Counter(all_flags)
-        fraud_summary['common_flags'] = dict(flag_counts.most_common(10))
+        fraud_summary['common_flags'] = dict(flag_counts.most_common(top_flags))
         
         # Risk by category
         category_risk = fraud_data.groupby('category').size().to_dict()
@@ -439,29 +1148,25 @@ class ReportGenerator:
 
     def generate_compliance_report(self) -> Dict:
         """Generate privacy compliance report"""
-        conn = sqlite3.connect(self.data_manager.db_path)
+        backend = self.data_manager.backend
+        conn = backend.reader()
+        now = datetime.now().isoformat()
         
         # Data retention compliance
-        retention_check = pd.read_sql_query('''
-        SELECT 
-            COUNT(*) as total_records,
-            SUM(CASE WHEN expiry_date > datetime('now') THEN 1 ELSE 0 END) as within_retention,
-            SUM(CASE WHEN expiry_date <= datetime('now') THEN 1 ELSE 0 END) as expired_records
-        FROM verifications
-        ''', conn)
+        retention_check = read_report(backend, conn, 'compliance_retention', (now, now))
         
         # Audit trail completeness
-        audit_check = pd.read_sql_query('''
-        SELECT COUNT(*) as audit_entries
-        FROM audit_log 
-        WHERE timestamp >= date('now', '-30 days')
-        ''', conn)
+        audit_check = read_report(backend, conn, 'compliance_audit', (_days_ago(30),))
         
         conn.close()
         
         retention_stats = retention_check.iloc[0].to_dict()
         audit_stats = audit_check.iloc[0].to_dict()
         
+        return self._compliance_result(retention_stats, audit_stats)
+    
+    def _compliance_result(self, retention_stats: Dict, audit_stats: Dict) -> Dict:
+        """Score retention and audit statistics and attach recommendations"""
         compliance_score = 100  # Start with perfect score
         
         # Deduct points for compliance issues
@@ -496,36 +1201,27 @@ class ReportGenerator:
         return recommendations
 
 # Utility functions for Streamlit integration
-def get_sample_data() -> Dict:
+def get_sample_data(count: int = 50, seed: int = 42) -> Dict:
     """Generate sample data for demo purposes"""
-    np.random.seed(42)  # For reproducible demo data
+    from synthetic_data import SyntheticDataGenerator
     
-    # Sample verification data
-    verifications = []
-    categories = ['citizen', 'legal_immigrant', 'undocumented']
-    doc_types = ['South African ID', 'Passport', 'Asylum Permit', 'Work Permit']
+    generator = SyntheticDataGenerator(seed=seed, days=30, patients=count)
+    batch = generator.verifications(count)
     
-    for i in range(50):
-        verification = {
+    verifications = []
+    for i in range(count):
+        confidence = int(batch['confidence'][i])
+        verifications.append({
             'id': f'VER-{i:03d}',
-            'patient_id': f'PAT-{i:03d}',
-            'document_type': np.random.choice(doc_types),
-            'category': np.random.choice(categories, p=[0.6, 0.3, 0.1]),
-            'confidence': np.random.randint(60, 99),
-            'timestamp': (datetime.now() - timedelta(days=np.random.randint(0, 30))).strftime('%Y-%m-%d %H:%M:%S'),
-            'document_valid': np.random.choice([True, False], p=[0.9, 0.1]),
-            'red_flags': [] if np.random.random() > 0.1 else ['Low confidence score']
-        }
-        
-        # Set eligibility based on category
-        eligibility_map = {
-            'citizen': 'free_care',
-            'legal_immigrant': 'partial_payment',
-            'undocumented': 'manual_review'
-        }
-        verification['eligibility'] = eligibility_map[verification['category']]
-        verification['status'] = 'completed' if verification['confidence'] > 70 else 'review_pending'
-        
-        verifications.append(verification)
+            'patient_id': str(batch['patient_id'][i]),
+            'document_type': str(batch['document_type'][i]),
+            'category': str(batch['category'][i]),
+            'eligibility': str(batch['eligibility'][i]),
+            'confidence': confidence,
+            'timestamp': str(batch['created_timestamp'][i]).replace('T', ' '),
+            'document_valid': bool(batch['document_valid'][i]),
+            'red_flags': json.loads(batch['red_flags'][i]),
+            'status': 'completed' if confidence > 70 else 'review_pending'
+        })
     
     return {'verifications': verifications}
@@ -0,0 +1,96 @@
+"""
+Document Image Ingestion for HealthVerify
+Decodes uploads page by page at a bounded resolution, directly to grayscale,
+so one large photo or multi-page scan cannot exhaust a worker's memory
+"""
+
+from __future__ import annotations
+
+import math
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from lazy_imports import lazy_import
+
+Image = lazy_import('PIL.Image')
+
+# Working resolution for OCR and fraud checks (~4 MP is ample for ID documents)
+DEFAULT_MAX_PIXELS = 4_000_000
+# Declared sizes above this are rejected before any pixel is decoded
+DEFAULT_MAX_SOURCE_PIXELS = 100_000_000
+DEFAULT_MAX_PAGES = 20
+
+
+class DocumentTooLarge(ValueError):
+    """Upload exceeds the ingestion limits"""
+
+
+def decode_page(image: Image.Image, max_pixels: int = DEFAULT_MAX_PIXELS) -> Image.Image:
+    """Decode the current frame as grayscale, scaled to at most ``max_pixels``"""
+    width, height = image.size
+    scale = min(1.0, math.sqrt(max_pixels / (width * height)))
+    target = (max(1, int(width * scale)), max(1, int(height * scale)))
+
+    # JPEG: decode only the luma channel, DCT-scaled down by up to 8x
+    if image.format == 'JPEG':
+        image.draft('L', target)
+
+    page = image.convert('L')
+    if page.width * page.height > max_pixels:
+        page = page.resize(target, Image.Resampling.BILINEAR, reducing_gap=2.0)
+    return page
+
+
+def iter_pages(source, max_pixels: int = DEFAULT_MAX_PIXELS,
+               max_source_pixels: int = DEFAULT_MAX_SOURCE_PIXELS,
+               max_pages: int = DEFAULT_MAX_PAGES) -> Iterator[Image.Image]:
+    """Lazily yield each page of an upload as a bounded grayscale image
+
+    ``source`` is a path, a file object or an already opened PIL image.
+    Only one decoded page is alive at a time.
+    """
+    try:
+        image = source if isinstance(source, Image.Image) else Image.open(source)
+    except Image.DecompressionBombError as e:
+        raise DocumentTooLarge(str(e))
+
+    try:
+        width, height = image.size
+        if width * height > max_source_pixels:
+            raise DocumentTooLarge(
+                f"{width}x{height} exceeds the {max_source_pixels:,} pixel limit")
+
+        page_count = getattr(image, 'n_frames', 1)
+        if page_count > max_pages:
+            raise DocumentTooLarge(f"{page_count} pages exceeds the {max_pages} page limit")
+
+        for page_index in range(page_count):
+            if page_count > 1:
+                image.seek(page_index)
+            yield decode_page(image, max_pixels)
+    finally:
+        if image is not source:
+            image.close()
+
+
+@contextmanager
+def track_peak_memory(report: Dict):
+    """Record the peak traced allocation of the block in ``report['peak_memory_bytes']``
+
+    Covers NumPy/OpenCV arrays and Python objects; Pillow's own pixel
+    buffers are reported separately as ``page_buffer_bytes``. tracemalloc is
+    process-global: concurrent blocks reset each other's peak, so use this
+    only where one document is processed at a time (benchmarks, diagnostics).
+    """
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    try:
+        yield report
+    finally:
+        report['peak_memory_bytes'] = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+        if started_here:
+            tracemalloc.stop()
@@ -0,0 +1,233 @@
+"""
+On-disk Document Spool for batch verification
+Queued uploads are stored as raw grayscale pages that workers map with
+np.memmap, so batch memory no longer grows with the length of the queue
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+from typing import Dict, List
+
+import document_ingest
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+class SpoolFull(RuntimeError):
+    """Accepting the document would exceed the spool's size bound"""
+
+
+class DocumentSpool:
+    """Directory of memory-mappable page files plus a SQLite manifest
+
+    Each document is one manifest row listing its page files; ``claim``
+    hands queued documents to exactly one worker, and ``complete`` removes
+    the files once the result has been stored.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.manifest_path = os.path.join(directory, 'manifest.db')
+
+        conn = sqlite3.connect(self.manifest_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS spooled_documents (
+            id TEXT PRIMARY KEY,
+            document_type TEXT NOT NULL,
+            pages TEXT NOT NULL,
+            total_bytes INTEGER NOT NULL,
+            state TEXT NOT NULL,
+            claimed_by INTEGER,
+            claimed_timestamp REAL,
+            created_timestamp REAL NOT NULL
+        )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_spooled_documents_state ON spooled_documents (state, created_timestamp)')
+        conn.commit()
+        conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.manifest_path, timeout=30, isolation_level=None)
+
+    def total_bytes(self) -> int:
+        conn = self._connect()
+        total = conn.execute('SELECT COALESCE(SUM(total_bytes), 0) FROM spooled_documents').fetchone()[0]
+        conn.close()
+        return total
+
+    def put(self, source, document_type: str,
+            max_pixels: int = document_ingest.DEFAULT_MAX_PIXELS) -> str:
+        """Decode an upload page by page into the spool; returns its entry id
+
+        The entry is recorded as 'writing' before any file exists, and each
+        page's bytes are reserved against ``max_bytes`` before it is written,
+        so concurrent uploads and ``cleanup`` never race on the same files.
+        """
+        entry_id = str(uuid.uuid4())
+        conn = self._connect()
+        conn.execute('''
+        INSERT INTO spooled_documents
+        (id, document_type, pages, total_bytes, state, created_timestamp)
+        VALUES (?, ?, '[]', 0, 'writing', ?)
+        ''', (entry_id, document_type, time.time()))
+        conn.close()
+
+        pages = []
+        try:
+            for index, page in enumerate(document_ingest.iter_pages(source, max_pixels=max_pixels)):
+                path = os.path.join(self.directory, f'{entry_id}.{index}.u8')
+                pages.append({'path': path, 'height': page.height, 'width': page.width})
+                self._reserve(entry_id, pages, page.width * page.height)
+                with open(path, 'wb') as f:
+                    f.write(page.tobytes())
+        except BaseException:
+            self._discard(entry_id, pages)
+            raise
+
+        conn = self._connect()
+        conn.execute('''
+        UPDATE spooled_documents SET state = 'queued', created_timestamp = ? WHERE id = ?
+        ''', (time.time(), entry_id))
+        conn.close()
+
+        return entry_id
+
+    def _reserve(self, entry_id: str, pages: List[Dict], size: int):
+        """Atomically check the size bound and record the entry's next page"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            used = conn.execute('SELECT COALESCE(SUM(total_bytes), 0) FROM spooled_documents').fetchone()[0]
+            if used + size > self.max_bytes:
+                raise SpoolFull(f"spool limit of {self.max_bytes:,} bytes reached")
+            conn.execute('''
+            UPDATE spooled_documents SET pages = ?, total_bytes = total_bytes + ? WHERE id = ?
+            ''', (json.dumps(pages), size, entry_id))
+            conn.execute('COMMIT')
+        finally:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            conn.close()
+
+    def _discard(self, entry_id: str, pages: List[Dict]):
+        conn = self._connect()
+        conn.execute('DELETE FROM spooled_documents WHERE id = ?', (entry_id,))
+        conn.close()
+        self._remove_files(pages)
+
+    def claim(self, limit: int = 1) -> List[Dict]:
+        """Take up to ``limit`` queued documents, oldest first, for this process"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        rows = conn.execute('''
+        SELECT id, document_type, pages FROM spooled_documents
+        WHERE state = 'queued'
+        ORDER BY created_timestamp
+        LIMIT ?
+        ''', (limit,)).fetchall()
+        conn.executemany('''
+        UPDATE spooled_documents SET state = 'processing', claimed_by = ?, claimed_timestamp = ?
+        WHERE id = ?
+        ''', [(os.getpid(), time.time(), row[0]) for row in rows])
+        conn.execute('COMMIT')
+        conn.close()
+
+        return [{'id': row[0], 'document_type': row[1], 'pages': json.loads(row[2])} for row in rows]
+
+    @staticmethod
+    def open_pages(entry: Dict) -> List[np.ndarray]:
+        """Read-only memory maps of a claimed document's pages (no copy)"""
+        return [np.memmap(page['path'], dtype=np.uint8, mode='r',
+                          shape=(page['height'], page['width']))
+                for page in entry['pages']]
+
+    def complete(self, entry_id: str):
+        """Drop a processed document and its page files"""
+        conn = self._connect()
+        row = conn.execute('SELECT pages FROM spooled_documents WHERE id = ?', (entry_id,)).fetchone()
+        conn.execute('DELETE FROM spooled_documents WHERE id = ?', (entry_id,))
+        conn.close()
+        if row:
+            self._remove_files(json.loads(row[0]))
+
+    def cleanup(self, stale_after_seconds: float = 3600) -> Dict[str, int]:
+        """Requeue documents whose worker died mid-batch and delete abandoned files
+
+        Uploads still 'writing' after ``stale_after_seconds`` are dropped, and
+        page files missing from the manifest are only deleted once they are
+        that old, so uploads in progress are never touched.
+        """
+        cutoff = time.time() - stale_after_seconds
+        conn = self._connect()
+        requeued = conn.execute('''
+        UPDATE spooled_documents SET state = 'queued', claimed_by = NULL, claimed_timestamp = NULL
+        WHERE state = 'processing' AND claimed_timestamp < ?
+        ''', (cutoff,)).rowcount
+
+        conn.execute('BEGIN IMMEDIATE')
+        abandoned = conn.execute('''
+        SELECT id, pages FROM spooled_documents WHERE state = 'writing' AND created_timestamp < ?
+        ''', (cutoff,)).fetchall()
+        conn.executemany('DELETE FROM spooled_documents WHERE id = ?', [(row[0],) for row in abandoned])
+        conn.execute('COMMIT')
+        known = {page['path'] for (pages,) in conn.execute('SELECT pages FROM spooled_documents')
+                 for page in json.loads(pages)}
+        conn.close()
+
+        for _, pages in abandoned:
+            self._remove_files(json.loads(pages))
+
+        orphans = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith('.u8') or path in known:
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    orphans.append(path)
+            except FileNotFoundError:
+                pass
+        self._remove_files([{'path': path} for path in orphans])
+
+        return {'requeued': requeued, 'abandoned_uploads_removed': len(abandoned),
+                'orphaned_files_removed': len(orphans)}
+
+    @staticmethod
+    def _remove_files(pages: List[Dict]):
+        for page in pages:
+            try:
+                os.remove(page['path'])
+            except FileNotFoundError:
+                pass
+
+
+def verify_spooled_batch(verifier, spool: DocumentSpool, batch_size: int = 8,
+                         on_result=None) -> List[Dict]:
+    """Claim and verify up to ``batch_size`` spooled documents
+
+    ``on_result(entry_id, result)`` runs before each document is removed
+    from the spool (e.g. to store the result); if it raises, the document
+    stays claimed and ``cleanup`` will requeue it.
+    """
+    results = []
+    for entry in spool.claim(batch_size):
+        page_results = verifier.verify_documents(DocumentSpool.open_pages(entry), entry['document_type'])
+        best = max(page_results, key=lambda result: result.get('confidence', 0))
+        best = dict(best, spool_entry_id=entry['id'], pages=len(entry['pages']))
+
+        if on_result is not None:
+            on_result(entry['id'], best)
+        spool.complete(entry['id'])
+        results.append(best)
+    return results
@@ -0,0 +1,177 @@
+"""
+Facility Sharding for HealthVerify
+Routes each facility (or facility group) to its own SQLite database and
+runs reports across all shards in parallel, merging partial aggregates
+"""
+
+import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from data_utils import ReportGenerator, SecureDataManager
+from pseudonymization import PatientPseudonymizer
+
+SHARD_PREFIX = 'facility_'
+SHARD_SUFFIX = '.db'
+
+
+class FacilityShardRouter:
+    """Maps facility IDs to per-shard SecureDataManager instances
+
+    ``facility_groups`` maps facility IDs to a shared shard name, so small
+    clinics can be grouped; unlisted facilities get a shard of their own.
+    All shards share one pseudonymizer, so a patient's hash is the same
+    whichever facility they visit.
+    """
+
+    def __init__(self, directory: str, facility_groups: Optional[Dict[str, str]] = None,
+                 pseudonymizer: PatientPseudonymizer = None):
+        self.directory = directory
+        self.facility_groups = dict(facility_groups or {})
+        self.pseudonymizer = pseudonymizer or PatientPseudonymizer()
+        self._managers: Dict[str, SecureDataManager] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def shard_name(self, facility_id: str) -> str:
+        name = self.facility_groups.get(facility_id, facility_id)
+        if not name or not re.fullmatch(r'[A-Za-z0-9_-]+', name):
+            raise ValueError(f"Invalid facility ID: {facility_id!r}")
+        return name
+
+    def shard_path(self, shard: str) -> str:
+        return os.path.join(self.directory, f'{SHARD_PREFIX}{shard}{SHARD_SUFFIX}')
+
+    def manager(self, facility_id: str) -> SecureDataManager:
+        """Data manager for the facility's shard, created on first use"""
+        return self._manager_for_shard(self.shard_name(facility_id))
+
+    def _manager_for_shard(self, shard: str) -> SecureDataManager:
+        manager = self._managers.get(shard)
+        if manager is None:
+            with self._lock:
+                manager = self._managers.get(shard)
+                if manager is None:
+                    manager = SecureDataManager(self.shard_path(shard), pseudonymizer=self.pseudonymizer)
+                    self._managers[shard] = manager
+        return manager
+
+    def shards(self) -> Dict[str, SecureDataManager]:
+        """Every shard on disk or opened in this process, by shard name"""
+        names = {name[len(SHARD_PREFIX):-len(SHARD_SUFFIX)] for name in os.listdir(self.directory)
+                 if name.startswith(SHARD_PREFIX) and name.endswith(SHARD_SUFFIX)}
+        names.update(self._managers)
+        return {name: self._manager_for_shard(name) for name in sorted(names)}
+
+
+def _sum_counts(rows: List[Dict], key) -> List[Dict]:
+    """Merge ``{..., 'count': n}`` records that share the same ``key`` fields"""
+    totals = Counter()
+    for row in rows:
+        totals[tuple(row[field] for field in key)] += row['count']
+    return [dict(zip(key, values), count=count) for values, count in sorted(totals.items())]
+
+
+class ShardedReportGenerator(ReportGenerator):
+    """ReportGenerator reports over every facility shard
+
+    Each report runs on all shards concurrently (SQLite and NumPy release
+    the GIL for the heavy parts) and the per-shard results are merged as
+    partial aggregates: counts are summed and averages re-weighted.
+    ``caches=True`` gives every shard its own VerificationColumnCache.
+    """
+
+    def __init__(self, router: FacilityShardRouter, max_workers: Optional[int] = None,
+                 caches: bool = False):
+        super().__init__(data_manager=None)
+        self.router = router
+        self.max_workers = max_workers
+        self.caches = caches
+        self._generators: Dict[str, ReportGenerator] = {}
+
+    def _generator(self, shard: str, manager: SecureDataManager) -> ReportGenerator:
+        generator = self._generators.get(shard)
+        if generator is None:
+            cache = None
+            if self.caches:
+                from verification_cache import VerificationColumnCache
+                cache = VerificationColumnCache(manager)
+            generator = self._generators.setdefault(shard, ReportGenerator(manager, cache=cache))
+        return generator
+
+    def fan_out(self, report: Callable[[ReportGenerator], Dict]) -> Dict[str, Dict]:
+        """Run ``report(generator)`` on every shard in parallel; results by shard name"""
+        generators = {shard: self._generator(shard, manager)
+                      for shard, manager in self.router.shards().items()}
+        if not generators:
+            return {}
+        with ThreadPoolExecutor(max_workers=self.max_workers or len(generators)) as pool:
+            futures = {shard: pool.submit(report, generator) for shard, generator in generators.items()}
+            return {shard: future.result() for shard, future in futures.items()}
+
+    def generate_analytics(self, days: int = 30) -> Dict:
+        parts = list(self.fan_out(lambda generator: generator.generate_analytics(days)).values())
+        daily_trends = _sum_counts([row for part in parts for row in part['daily_trends']],
+                                   ('date', 'category'))
+        red_flags = [row for part in parts for row in part['red_flags_summary']]
+        return {
+            'category_distribution': _sum_counts(
+                [row for part in parts for row in part['category_distribution']], ('category',)),
+            'daily_trends': daily_trends,
+            'confidence_distribution': _sum_counts(
+                [row for part in parts for row in part['confidence_distribution']], ('confidence_range',)),
+            'red_flags_summary': [{
+                # MAX(red_flags) over all shards, as one unsharded database reports it
+                'red_flags': max((row['red_flags'] for row in red_flags if row['red_flags']), default=None),
+                'count': sum(row['count'] for row in red_flags),
+            }],
+            'total_verifications': len(daily_trends)
+        }
+
+    def generate_daily_summary(self, date: str = None) -> Dict:
+        if date is None:
+            date = datetime.now().strftime('%Y-%m-%d')
+
+        parts = [part for part in self.fan_out(lambda generator: generator.generate_daily_summary(date)).values()
+                 if not part.get('no_data') and part['total_verifications']]
+        if not parts:
+            return {'date': date, 'no_data': True}
+
+        stats = {field: sum(part[field] or 0 for part in parts)
+                 for field in ('total_verifications', 'citizens', 'legal_immigrants',
+                               'undocumented', 'valid_documents')}
+        stats['avg_confidence'] = sum(part['avg_confidence'] * part['total_verifications']
+                                      for part in parts) / stats['total_verifications']
+        stats['date'] = date
+        stats['validity_rate'] = stats['valid_documents'] / stats['total_verifications'] * 100
+        return stats
+
+    def generate_fraud_report(self, days: int = 30, top_flags: Optional[int] = 10) -> Dict:
+        # Shards report every flag so the merged top list is exact
+        parts = self.fan_out(lambda generator: generator.generate_fraud_report(days, top_flags=None)).values()
+        flags, risk = Counter(), Counter()
+        total = 0
+        for part in parts:
+            total += part['total_flagged_cases']
+            flags.update(part['common_flags'])
+            risk.update(part['risk_by_category'])
+        return {
+            'total_flagged_cases': total,
+            'fraud_rate': total / max(1, total) * 100,
+            'common_flags': dict(flags.most_common(top_flags)),
+            'risk_by_category': {category: int(risk[category]) for category in sorted(risk)}
+        }
+
+    def generate_compliance_report(self) -> Dict:
+        parts = self.fan_out(lambda generator: generator.generate_compliance_report()).values()
+        retention = dict.fromkeys(('total_records', 'within_retention', 'expired_records'), 0)
+        audit = {'audit_entries': 0}
+        for part in parts:
+            for totals, stats in ((retention, part['data_retention']), (audit, part['audit_trail'])):
+                for field in totals:
+                    totals[field] += int(stats[field] or 0)
+        return self._compliance_result(retention, audit)
@@ -1,117 +1,213 @@
-from flask import Flask, render_template, request, jsonify, session
-import pandas as pd
-import numpy as np
+import time
+
+# Taken before the heavy imports so the startup figure includes dependency loading
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import Flask, Blueprint, Response, current_app, g, render_template, request, jsonify, session
 from datetime import datetime, timedelta
+import gzip
+import hashlib
 import json
 import os
+import threading
 
-app = Flask(__name__)
-app.secret_key = 'painease-secret-key-change-in-production'
-
-# Pain relief techniques
-RELIEF_TECHNIQUES = {
-    'breathing': {
-        'name': 'Deep Breathing Exercise',
-        'description': 'Slow, controlled breathing to reduce pain and anxiety',
-        'duration': '5-10 minutes',
-        'steps': [
-            'Sit or lie down in a comfortable position',
-            'Place one hand on your chest, one on your belly',
-            'Breathe in slowly through your nose for 4 counts',
-            'Hold your breath for 4 counts',
-            'Exhale slowly through your mouth for 6 counts',
-            'Repeat 5-10 times'
-        ]
-    },
-    'positioning': {
-        'name': 'Comfort Positioning',
-        'description': 'Optimal positioning to reduce pressure and pain',
-        'duration': 'Ongoing',
-        'steps': [
-            'Find a comfortable chair or lying position',
-            'Use pillows to support painful areas',
-            'Elevate legs if experiencing lower body pain',
-            'Keep your spine neutral and supported',
-            'Change positions every 15-20 minutes'
-        ]
-    },
-    'distraction': {
-        'name': 'Mental Distraction',
-        'description': 'Redirect focus away from pain through mental exercises',
-        'duration': '10-15 minutes',
-        'steps': [
-            'Close your eyes and imagine a peaceful place',
-            'Count backwards from 100 by 7s',
-            'Name 5 things you can see, 4 you can hear, 3 you can touch',
-            'Listen to calming music or sounds',
-            'Focus on positive memories or experiences'
-        ]
-    },
-    'movement': {
-        'name': 'Gentle Movement',
-        'description': 'Light stretching and movement to improve circulation',
-        'duration': '5-10 minutes',
-        'steps': [
-            'Start with gentle neck rolls',
-            'Slowly roll your shoulders',
-            'Stretch your arms above your head',
-            'Gently twist your spine left and right',
-            'Do ankle circles if seated'
-        ],
-        'warning': 'Stop if movement increases pain'
-    }
-}
+from ai_verification import DocumentVerifier, verify_returning_patient
+from alerting import AlertMonitor
+from data_utils import SecureDataManager
+from instrumentation import INSTRUMENTATION, SlowRequestProfiler
+from live_metrics import MetricsService
+from storage_backends import backend_from_url
+from system_metrics import SystemMetricsRecorder
+from pain_triage import (
+    RELIEF_TECHNIQUES, PAIN_DESCRIPTIONS, RECOMMENDATION_RULES,
+    assess_pain_emergency, get_relief_recommendations
+)
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Config:
+    """Base configuration shared by every environment"""
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'painease-secret-key-change-in-production')
+    DEBUG = False
+    TEMPLATES_AUTO_RELOAD = False
+    DATABASE_PATH = os.environ.get('DATABASE_PATH', 'painease_data.db')
+    # postgresql://... selects the PostgreSQL backend; unset means SQLite at DATABASE_PATH
+    DATABASE_URL = os.environ.get('DATABASE_URL')
+    # Compile templates up front so forked workers share them
+    PRELOAD_SHARED_DATA = False
+    # Seconds browsers may reuse a cached page before revalidating with its ETag
+    PAGE_MAX_AGE = 300
+    # Versioned assets never change under the same URL
+    ASSET_MAX_AGE = 31536000
+    # Stage/DB timers; when off they cost one attribute check per call
+    INSTRUMENTATION_ENABLED = os.environ.get('PAINEASE_INSTRUMENTATION', '1') != '0'
+    # Fraction of requests run under cProfile; captures kept only when slow
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PAINEASE_PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_THRESHOLD_MS = 500
+    PROFILE_TRACE_MEMORY = False
+    # Serve the captures at /metrics/profiles; never enable on a public endpoint
+    EXPOSE_PROFILES = os.environ.get('PAINEASE_EXPOSE_PROFILES') == '1'
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    EXPOSE_PROFILES = True
+    TEMPLATES_AUTO_RELOAD = True
+    PAGE_MAX_AGE = 0
+
+
+class ProductionConfig(Config):
+    PRELOAD_SHARED_DATA = True
 
-PAIN_DESCRIPTIONS = {
-    1: "No pain", 2: "Mild pain", 3: "Moderate pain", 4: "Moderate-severe pain",
-    5: "Severe pain", 6: "Very severe pain", 7: "Intense pain", 
-    8: "Extremely intense pain", 9: "Excruciating pain", 10: "Unbearable pain"
+
+CONFIGS = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
 }
 
-def assess_pain_emergency(pain_level, symptoms):
-    """Check if pain assessment indicates emergency"""
-    if pain_level >= 8:
-        return True
-    
-    emergency_keywords = ['chest pain', 'difficulty breathing', 'severe headache', 
-                         'stroke', 'bleeding', 'fever', 'unconscious']
+main = Blueprint('main', __name__)
+
+COMPRESSIBLE_MIMETYPES = {'text/html', 'text/css', 'application/json'}
+# Below this size the encoding overhead outweighs the savings
+MIN_COMPRESS_SIZE = 512
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
+
+def compress_body(data: bytes, encoding: str, static: bool = False) -> bytes:
+    """Compress a response body; static content gets the slow, maximum level"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if static else 5)
+    return gzip.compress(data, compresslevel=9 if static else 6)
+
+def negotiate_encoding():
+    """Pick the best content-coding the client accepts"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+class CachedPage:
+    """Rendered body with a strong ETag and lazily built compressed variants"""
     
-    for symptom in symptoms:
-        for keyword in emergency_keywords:
-            if keyword in symptom.lower():
-                return True
+    def __init__(self, body: bytes, mimetype: str):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = content_hash(body)
+        self._variants = {}
     
-    return False
+    def encoded(self, encoding):
+        if encoding is None:
+            return self.body
+        if encoding not in self._variants:
+            self._variants[encoding] = compress_body(self.body, encoding, static=True)
+        return self._variants[encoding]
+
+def get_cached_page(key, build):
+    """Return the cached page for ``key``, building it on first use"""
+    cache = current_app.extensions['painease_page_cache']
+    page = cache.get(key)
+    if page is None:
+        page = cache[key] = build()
+    return page
 
-def get_relief_recommendations(pain_level, pain_type, location, symptoms):
-    """Generate personalized relief recommendations"""
-    recommendations = []
+def cached_response(page, max_age, immutable=False):
+    """Serve a cached page, answering revalidation with 304 Not Modified"""
+    encoding = None
+    if page.mimetype in COMPRESSIBLE_MIMETYPES and len(page.body) >= MIN_COMPRESS_SIZE:
+        encoding = negotiate_encoding()
     
-    if pain_level >= 4:
-        recommendations.append('breathing')
+    # Each content-coding is a different representation, so it gets its own strong tag
+    etag = page.etag if encoding is None else f"{page.etag}-{encoding}"
     
-    recommendations.append('positioning')
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(page.encoded(encoding), mimetype=page.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
     
-    if pain_level >= 3:
-        recommendations.append('distraction')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = (
+        f"public, max-age={max_age}, {'immutable' if immutable else 'must-revalidate'}")
+    response.vary.add('Accept-Encoding')
     
-    if (pain_level <= 6 and 
-        location != 'chest' and 
-        'shortness of breath' not in symptoms):
-        recommendations.append('movement')
+    return response
+
+def render_cached_page(template_name, **context):
+    """Render a context-free template once per template version and serve it from cache"""
+    key = (template_name, current_app.config['TEMPLATE_VERSION'])
+    page = get_cached_page(
+        key, lambda: CachedPage(render_template(template_name, **context).encode(), 'text/html'))
+    return cached_response(page, current_app.config['PAGE_MAX_AGE'])
+
+@main.before_app_request
+def ensure_store():
+    open_store(current_app)
+
+@main.before_app_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.request_profile = current_app.extensions['painease_profiler'].start()
+
+@main.after_app_request
+def record_request_latency(response):
+    """Feed per-endpoint latency into the system_metrics table"""
+    started = g.pop('request_started', None)
+    if started is not None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        name = f"http.{request.endpoint or 'unmatched'}.latency_ms"
+        recorder = current_app.extensions['painease_system_metrics']
+        if INSTRUMENTATION.enabled:
+            # The registry forwards to the recorder as one of its sinks
+            INSTRUMENTATION.observe(name, elapsed_ms)
+        else:
+            recorder.record(name, elapsed_ms)
+        recorder.record('metrics.buffer_depth', recorder.buffer_depth)
+        
+        current_app.extensions['painease_profiler'].finish(
+            g.pop('request_profile', None), elapsed_ms, f"{request.method} {request.path}")
+    return response
+
+@main.after_app_request
+def compress_response(response):
+    """Compress dynamic HTML and JSON responses"""
+    if (response.direct_passthrough
+            or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    response.vary.add('Accept-Encoding')
     
-    return [RELIEF_TECHNIQUES[rec] for rec in recommendations]
+    body = response.get_data()
+    encoding = negotiate_encoding()
+    if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+        return response
+    
+    response.set_data(compress_body(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    
+    return response
 
-@app.route('/')
+@main.route('/')
 def home():
-    return render_template('home.html')
+    return render_cached_page('home.html')
 
-@app.route('/relief')
+@main.route('/relief')
 def relief():
-    return render_template('relief.html', 
-                         pain_descriptions=PAIN_DESCRIPTIONS)
+    return render_cached_page('relief.html', 
+                              pain_descriptions=PAIN_DESCRIPTIONS)
 
-@app.route('/api/assess_pain', methods=['POST'])
+@main.route('/api/assess_pain', methods=['POST'])
 def assess_pain():
     data = request.json
     
@@ -134,6 +230,9 @@ def assess_pain():
     # Check for emergency
     is_emergency = assess_pain_emergency(pain_level, symptoms)
     
+    store = current_app.extensions['painease_store']
+    session['assessment_id'] = store.store_pain_assessment(session['pain_assessment'], is_emergency)
+    
     if is_emergency:
         return jsonify({
             'status': 'emergency',
@@ -150,7 +249,7 @@ def assess_pain():
         'warning': pain_level >= 7
     })
 
-@app.route('/api/update_pain', methods=['POST'])
+@main.route('/api/update_pain', methods=['POST'])
 def update_pain():
     data = request.json
     new_pain_level = int(data.get('pain_level', 5))
@@ -170,6 +269,10 @@ def update_pain():
             'timestamp': datetime.now().isoformat()
         })
         
+        if 'assessment_id' in session:
+            store = current_app.extensions['painease_store']
+            store.record_pain_progress(session['assessment_id'], new_pain_level)
+        
         return jsonify({
             'status': 'success',
             'improvement': improvement,
@@ -178,18 +281,85 @@ def update_pain():
     
     return jsonify({'status': 'error', 'message': 'No assessment found'})
 
-@app.route('/analytics')
+@main.route('/api/stats')
+def stats():
+    return jsonify(current_app.extensions['painease_metrics'].snapshot())
+
+@main.route('/metrics')
+def metrics():
+    """Timer histograms in the Prometheus text format"""
+    recorder = current_app.extensions['painease_system_metrics']
+    body = INSTRUMENTATION.render_prometheus() + (
+        '# HELP painease_metrics_buffer_depth Samples waiting to be written to system_metrics\n'
+        '# TYPE painease_metrics_buffer_depth gauge\n'
+        f'painease_metrics_buffer_depth {recorder.buffer_depth}\n'
+        '# HELP painease_metrics_dropped_samples_total Samples dropped while the buffer was full\n'
+        '# TYPE painease_metrics_dropped_samples_total counter\n'
+        f'painease_metrics_dropped_samples_total {recorder.dropped_samples}\n')
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+# Registered by create_app only when EXPOSE_PROFILES is set: captures reveal code paths and timings
+def slow_request_profiles():
+    """Most recent cProfile captures of sampled slow requests"""
+    return jsonify(list(current_app.extensions['painease_profiler'].captures))
+
+@main.route('/api/verify_document', methods=['POST'])
+def verify_document():
+    """Verify an uploaded identity document, reusing a recent result for the patient"""
+    upload = request.files.get('document')
+    patient_id = request.form.get('patient_id', '')
+    document_type = request.form.get('document_type', '')
+    if upload is None or not patient_id or not document_type:
+        return jsonify({'status': 'error', 'message': 'document, patient_id and document_type are required'})
+    
+    result = verify_returning_patient(
+        get_verifier(current_app), current_app.extensions['painease_store'],
+        patient_id, upload.stream, document_type,
+        alert_monitor=current_app.extensions['painease_alerts'])
+    
+    return jsonify({
+        'status': 'error' if result.get('error') else 'success',
+        'verification': result
+    })
+
+@main.route('/api/alerts')
+def active_alerts():
+    return jsonify(current_app.extensions['painease_store'].get_active_alerts())
+
+@main.route('/api/alerts/<alert_id>/resolve', methods=['POST'])
+def resolve_alert(alert_id):
+    data = request.get_json(silent=True) or {}
+    store = current_app.extensions['painease_store']
+    if store.resolve_alert(alert_id, resolved_by=data.get('resolved_by', 'staff')):
+        return jsonify({'status': 'success', 'resolved': 1})
+    return jsonify({'status': 'error', 'message': 'Alert not found or already resolved'})
+
+@main.route('/api/alerts/resolve', methods=['POST'])
+def resolve_alerts():
+    """Resolve every open alert of one type, e.g. after a fraud wave is handled"""
+    data = request.get_json(silent=True) or {}
+    if not data.get('alert_type'):
+        return jsonify({'status': 'error', 'message': 'alert_type is required'})
+    
+    store = current_app.extensions['painease_store']
+    resolved = store.resolve_alerts(alert_type=data['alert_type'],
+                                    resolved_by=data.get('resolved_by', 'staff'))
+    return jsonify({'status': 'success', 'resolved': resolved})
+
+@main.route('/analytics')
 def analytics():
     progress_history = session.get('progress_history', [])
     return render_template('analytics.html', progress_history=progress_history)
 
-@app.route('/emergency')
+@main.route('/emergency')
 def emergency():
-    return render_template('emergency.html')
+    return render_cached_page('emergency.html')
 
-# Create templates directory and HTML files
-if not os.path.exists('templates'):
-    os.makedirs('templates')
+@main.route('/assets/painease.css')
+def stylesheet():
+    """Locally served, purged stylesheet; the URL carries its content hash"""
+    page = current_app.extensions['painease_assets']['painease.css']
+    return cached_response(page, current_app.config['ASSET_MAX_AGE'], immutable=True)
 
 # Base template
 base_template = '''
@@ -199,14 +369,7 @@ base_template = '''
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>{% block title %}PainEase{% endblock %}</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <style>
-        .pain-scale {
-            background: linear-gradient(90deg, #27AE60 0%, #F39C12 50%, #E74C3C 100%);
-            height: 20px;
-            border-radius: 10px;
-        }
-    </style>
+    <link rel="stylesheet" href="{{ stylesheet_url }}">
 </head>
 <body class="bg-gray-50">
     <nav class="bg-white shadow-sm border-b">
@@ -244,9 +407,6 @@ base_template = '''
 </html>
 '''
 
-with open('templates/base.html', 'w') as f:
-    f.write(base_template)
-
 # Home template
 home_template = '''
 {% extends "base.html" %}
@@ -260,20 +420,20 @@ home_template = '''
 
 <div class="grid grid-cols-1 md:grid-cols-4 gap-6 mb-8">
     <div class="bg-white p-6 rounded-lg shadow">
-        <div class="text-3xl font-bold text-blue-600">2.3M+</div>
+        <div id="stat-patients" class="text-3xl font-bold text-blue-600">–</div>
         <div class="text-gray-600">Patients Helped</div>
     </div>
     <div class="bg-white p-6 rounded-lg shadow">
-        <div class="text-3xl font-bold text-blue-600">147</div>
-        <div class="text-gray-600">Hospitals</div>
+        <div id="stat-today" class="text-3xl font-bold text-blue-600">–</div>
+        <div class="text-gray-600">Assessments Today</div>
     </div>
     <div class="bg-white p-6 rounded-lg shadow">
-        <div class="text-3xl font-bold text-blue-600">94.2%</div>
+        <div id="stat-success" class="text-3xl font-bold text-blue-600">–</div>
         <div class="text-gray-600">Success Rate</div>
     </div>
     <div class="bg-white p-6 rounded-lg shadow">
-        <div class="text-3xl font-bold text-blue-600">8 min</div>
-        <div class="text-gray-600">Avg Session</div>
+        <div id="stat-session" class="text-3xl font-bold text-blue-600">–</div>
+        <div class="text-gray-600">Median Session</div>
     </div>
 </div>
 
@@ -298,12 +458,19 @@ home_template = '''
         </ul>
     </div>
 </div>
+
+<script>
+// The page itself is cached; live figures come from the metrics service
+fetch('/api/stats').then(r => r.json()).then(stats => {
+    document.getElementById('stat-patients').textContent = stats.assessments_total.toLocaleString();
+    document.getElementById('stat-today').textContent = stats.assessments_24h.toLocaleString();
+    document.getElementById('stat-success').textContent = stats.outcomes_total ? stats.success_rate.toFixed(1) + '%' : '–';
+    document.getElementById('stat-session').textContent = stats.session_minutes_p50 !== null ? stats.session_minutes_p50.toFixed(1) + ' min' : '–';
+});
+</script>
 {% endblock %}
 '''
 
-with open('templates/home.html', 'w') as f:
-    f.write(home_template)
-
 # Relief template
 relief_template = '''
 {% extends "base.html" %}
@@ -411,7 +578,7 @@ relief_template = '''
 </div>
 
 <script>
-const painDescriptions = {{ pain_descriptions | tojsonfilter }};
+const painDescriptions = {{ pain_descriptions | tojson }};
 
 // Update pain description
 document.getElementById('pain-level').addEventListener('input', function() {
@@ -502,8 +669,205 @@ document.getElementById('update-pain').addEventListener('click', async function(
 {% endblock %}
 '''
 
-with open('templates/relief.html', 'w') as f:
-    f.write(relief_template)
+# Emergency template
+emergency_template = '''
+{% extends "base.html" %}
+
+{% block content %}
+<div class="max-w-4xl mx-auto">
+    <h1 class="text-3xl font-bold mb-6">🚨 Emergency Assistance</h1>
+    
+    <div class="bg-red-100 border border-red-400 text-red-700 px-4 py-3 rounded mb-6">
+        <strong>IMMEDIATE MEDICAL ATTENTION REQUIRED</strong><br>
+        Based on your symptoms, you need immediate medical evaluation. Please inform medical staff now.
+    </div>
+    
+    <div class="bg-white p-6 rounded-lg shadow mb-6">
+        <h2 class="text-2xl font-bold mb-4">⚠️ Emergency Symptoms</h2>
+        <p class="text-gray-600 mb-2">If you are experiencing any of these symptoms, seek immediate medical help:</p>
+        <ul class="space-y-2">
+            <li>• Chest pain with shortness of breath</li>
+            <li>• Severe headache with vision changes</li>
+            <li>• Difficulty breathing</li>
+            <li>• Signs of stroke (face drooping, arm weakness, speech difficulty)</li>
+            <li>• Severe abdominal pain</li>
+            <li>• High fever (over 39°C/102°F)</li>
+            <li>• Uncontrolled bleeding</li>
+            <li>• Loss of consciousness</li>
+        </ul>
+    </div>
+    
+    <div class="grid grid-cols-1 md:grid-cols-2 gap-6">
+        <div class="bg-white p-6 rounded-lg shadow">
+            <h3 class="text-xl font-bold mb-2">📞 Emergency Services</h3>
+            <ul class="space-y-2">
+                <li>South Africa: 10177</li>
+                <li>Kenya: 999</li>
+                <li>Nigeria: 199</li>
+            </ul>
+        </div>
+        <div class="bg-white p-6 rounded-lg shadow">
+            <h3 class="text-xl font-bold mb-2">☎️ Poison Control</h3>
+            <ul class="space-y-2">
+                <li>South Africa: 0861 555 777</li>
+                <li>Universal: Contact local emergency</li>
+            </ul>
+        </div>
+    </div>
+    
+    <a href="/relief" class="inline-block mt-6 bg-blue-600 text-white px-6 py-3 rounded-lg font-semibold hover:bg-blue-700">← Return to Pain Assessment</a>
+</div>
+{% endblock %}
+'''
+
+TEMPLATES = {
+    'base.html': base_template,
+    'home.html': home_template,
+    'relief.html': relief_template,
+    'emergency.html': emergency_template,
+}
+
+def write_templates(template_dir):
+    """Write the bundled templates, skipping files that are already current"""
+    os.makedirs(template_dir, exist_ok=True)
+    
+    for name, content in TEMPLATES.items():
+        path = os.path.join(template_dir, name)
+        if os.path.exists(path):
+            with open(path) as f:
+                if f.read() == content:
+                    continue
+        with open(path, 'w') as f:
+            f.write(content)
+
+def load_assets():
+    """Read the static assets served from memory"""
+    with open(os.path.join(BASE_DIR, 'static', 'painease.css'), 'rb') as f:
+        return {'painease.css': CachedPage(f.read(), 'text/css')}
+
+def preload_shared_data(app):
+    """Compile templates and warm read-only tables before workers fork
+    
+    Everything loaded here lives in the master process, so forked workers
+    share the pages copy-on-write instead of each building their own copy.
+    """
+    with app.app_context():
+        for name in app.jinja_env.list_templates():
+            app.jinja_env.get_template(name)
+    
+    # Render the static pages and their compressed variants once
+    with app.test_request_context(headers={'Accept-Encoding': 'br, gzip'}):
+        for endpoint in ('main.home', 'main.relief', 'main.emergency'):
+            app.view_functions[endpoint]()
+        pages = list(app.extensions['painease_page_cache'].values())
+        for page in pages + list(app.extensions['painease_assets'].values()):
+            page.encoded('gzip')
+            if brotli is not None:
+                page.encoded('br')
+    
+    # Only dict/tuple lookups remain at request time
+    return {
+        'templates': len(app.jinja_env.list_templates()),
+        'cached_pages': len(app.extensions['painease_page_cache']),
+        'recommendation_rules': len(RECOMMENDATION_RULES),
+        'techniques': len(RELIEF_TECHNIQUES),
+    }
+
+def open_store(app):
+    """Open the data store and the services built on it, once per process
+    
+    Deferred from create_app so importing or building the app (including
+    the gunicorn master that preloads it) never touches the database, and
+    each forked worker opens its own connections and flush thread.
+    """
+    store = app.extensions.get('painease_store')
+    if store is not None:
+        return store
+    
+    with app.extensions['painease_store_lock']:
+        store = app.extensions.get('painease_store')
+        if store is not None:
+            return store
+        
+        database_url = app.config.get('DATABASE_URL')
+        store = SecureDataManager(
+            app.config['DATABASE_PATH'], backend=backend_from_url(database_url) if database_url else None)
+        app.extensions['painease_system_metrics'] = SystemMetricsRecorder(store)
+        app.extensions['painease_alerts'] = AlertMonitor(store)
+        app.extensions['painease_metrics'] = MetricsService(store)
+        if app.config['INSTRUMENTATION_ENABLED']:
+            INSTRUMENTATION.add_sink(app.extensions['painease_system_metrics'].record, 'system_metrics')
+            INSTRUMENTATION.add_sink(app.extensions['painease_alerts'].observe_latency, 'alerts')
+        # Published last: other threads only see the store once its services exist
+        app.extensions['painease_store'] = store
+    return store
+
+def get_verifier(app):
+    """Document verifier, built on the first verification so other requests never load numpy"""
+    verifier = app.extensions.get('painease_verifier')
+    if verifier is None:
+        with app.extensions['painease_store_lock']:
+            verifier = app.extensions.get('painease_verifier')
+            if verifier is None:
+                verifier = app.extensions['painease_verifier'] = DocumentVerifier()
+    return verifier
+
+def create_app(config=None):
+    """Application factory
+    
+    ``config`` may be a key of ``CONFIGS``, a config class or a mapping.
+    Defaults to the ``PAINEASE_ENV`` environment variable, then development.
+    """
+    started = time.perf_counter()
+    
+    if config is None:
+        config = os.environ.get('PAINEASE_ENV', 'development')
+    if isinstance(config, str):
+        if config not in CONFIGS:
+            raise ValueError(f"Unknown config: {config}")
+        config = CONFIGS[config]
+    
+    template_dir = os.path.join(BASE_DIR, 'templates')
+    write_templates(template_dir)
+    
+    app = Flask(__name__, template_folder=template_dir)
+    if isinstance(config, dict):
+        app.config.from_object(Config)
+        app.config.update(config)
+    else:
+        app.config.from_object(config)
+    
+    app.register_blueprint(main)
+    if app.config['EXPOSE_PROFILES']:
+        app.add_url_rule('/metrics/profiles', view_func=slow_request_profiles)
+    # The store and the services reading it are opened by open_store on the first request
+    app.extensions['painease_store_lock'] = threading.Lock()
+    if app.config['INSTRUMENTATION_ENABLED']:
+        INSTRUMENTATION.enabled = True
+    app.extensions['painease_profiler'] = SlowRequestProfiler(
+        sample_rate=app.config['PROFILE_SAMPLE_RATE'],
+        threshold_ms=app.config['PROFILE_THRESHOLD_MS'],
+        trace_memory=app.config['PROFILE_TRACE_MEMORY'])
+    
+    # Rendered pages are keyed by template version, so a changed template is never served stale
+    assets = load_assets()
+    app.extensions['painease_assets'] = assets
+    app.extensions['painease_page_cache'] = {}
+    app.config['TEMPLATE_VERSION'] = content_hash(
+        ''.join(TEMPLATES[name] for name in sorted(TEMPLATES)).encode() + assets['painease.css'].body)
+    app.jinja_env.globals['stylesheet_url'] = f"/assets/painease.css?v={assets['painease.css'].etag[:12]}"
+    
+    if app.config.get('PRELOAD_SHARED_DATA'):
+        app.config['PRELOADED'] = preload_shared_data(app)
+    
+    finished = time.perf_counter()
+    app.config['STARTUP_TIME'] = {
+        'create_app_seconds': finished - started,
+        'since_import_seconds': finished - _IMPORT_STARTED,
+    }
+    
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app = create_app()
+    app.run(debug=app.config['DEBUG'], host='0.0.0.0', port=5000)
\ No newline at end of file
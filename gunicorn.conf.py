@@ -0,0 +1,55 @@
+"""
+Gunicorn configuration for the PainEase Flask app
+
+The app is loaded once in the master (``preload_app``) so templates and
+rule tables are shared copy-on-write by every worker. Tune with:
+
+    PAINEASE_BIND      address to listen on (default 0.0.0.0:5000)
+    PAINEASE_WORKERS   worker processes (default 2 * CPUs + 1)
+    PAINEASE_THREADS   threads per worker (default 1, >1 uses gthread)
+    PAINEASE_TIMEOUT   worker timeout in seconds (default 30)
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('PAINEASE_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('PAINEASE_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('PAINEASE_THREADS', 1))
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.environ.get('PAINEASE_TIMEOUT', 30))
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    """Report startup time and freeze preloaded objects before forking"""
+    app = server.app.wsgi()
+    startup = app.config.get('STARTUP_TIME', {})
+    server.log.info(
+        "PainEase ready in %.1f ms (create_app %.1f ms), preloaded %s",
+        startup.get('since_import_seconds', 0) * 1000,
+        startup.get('create_app_seconds', 0) * 1000,
+        app.config.get('PRELOADED', {}),
+    )
+    server.log.info("Starting %d worker(s) x %d thread(s)", workers, threads)
+
+    # Move everything allocated so far out of the collector's reach; otherwise
+    # the first GC pass in each worker touches every object and unshares the pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    server.log.info("Worker %s spawned", worker.pid)
+
+
+def worker_exit(server, worker):
+    """Write buffered system metrics and queued alerts before the worker goes away"""
+    # Absent if the worker never served a request (the store opens lazily)
+    for name in ('painease_system_metrics', 'painease_alerts'):
+        service = worker.wsgi.extensions.get(name)
+        if service is not None:
+            service.stop()
@@ -0,0 +1,248 @@
+"""
+Instrumentation Layer for HealthVerify / PainEase
+Named timers aggregated into histograms, optional forwarding to sinks such
+as the system_metrics recorder, and sampled profiling of slow requests
+"""
+
+import bisect
+import cProfile
+import io
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from collections import deque
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+# Upper bounds in milliseconds; roughly x2.5 per step from 0.1 ms to 60 s
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+                    1000, 2500, 5000, 10000, 30000, 60000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max', '_lock')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value_ms: float):
+        index = bisect.bisect_left(BUCKET_BOUNDS_MS, value_ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += value_ms
+            self.min = min(self.min, value_ms)
+            self.max = max(self.max, value_ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``q`` quantile"""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(BUCKET_BOUNDS_MS, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count if self.count else None,
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'max_ms': self.max if self.count else None,
+        }
+
+
+class _NullTimer:
+    """Shared no-op context manager returned while instrumentation is off"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('registry', 'name', 'started')
+
+    def __init__(self, registry: 'Instrumentation', name: str):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+class Instrumentation:
+    """Registry of named timers
+
+    While disabled, ``timer`` returns a shared no-op object and ``timed``
+    wrappers cost a single attribute check.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self._sinks: Dict[object, Callable[[str, float], None]] = {}
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink: Callable[[str, float], None], name: str = None):
+        """Also forward every observation to ``sink(name, value_ms)``
+
+        A named sink replaces any earlier sink registered under that name, so
+        building a second app in the same process does not double-record.
+        """
+        with self._lock:
+            # Swap in a new dict; observe() may be iterating the old one
+            self._sinks = {**self._sinks, name or sink: sink}
+
+    def timer(self, name: str):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name: str = None):
+        """Decorator timing every call of the wrapped function"""
+        def decorator(func):
+            metric = name or f"{func.__module__}.{func.__qualname__}"
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(self, metric):
+                    return func(*args, **kwargs)
+
+            return wrapper
+        return decorator
+
+    def observe(self, name: str, value_ms: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        histogram.observe(value_ms)
+        for sink in self._sinks.values():
+            sink(name, value_ms)
+
+    def increment(self, name: str, amount: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+
+    def render_prometheus(self) -> str:
+        """Histograms and counters in the Prometheus text exposition format"""
+        lines = [
+            '# HELP painease_timer_milliseconds Duration of instrumented operations',
+            '# TYPE painease_timer_milliseconds histogram',
+        ]
+        for name, histogram in sorted(self.histograms.items()):
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            cumulative = 0
+            for bound, count in zip(BUCKET_BOUNDS_MS, histogram.counts):
+                cumulative += count
+                lines.append(f'painease_timer_milliseconds_bucket{{name="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'painease_timer_milliseconds_bucket{{name="{label}",le="+Inf"}} {histogram.count}')
+            lines.append(f'painease_timer_milliseconds_sum{{name="{label}"}} {histogram.total:.6f}')
+            lines.append(f'painease_timer_milliseconds_count{{name="{label}"}} {histogram.count}')
+
+        if self.counters:
+            lines.append('# HELP painease_events_total Instrumented event counters')
+            lines.append('# TYPE painease_events_total counter')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'painease_events_total{{name="{name}"}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+class SlowRequestProfiler:
+    """Profiles a random sample of requests and keeps the slow ones
+
+    cProfile and tracemalloc are process-wide, so at most one request is
+    profiled at a time; sampled requests that find the profiler busy run
+    unprofiled.
+    """
+
+    def __init__(self, sample_rate: float = 0.01, threshold_ms: float = 500,
+                 keep: int = 20, trace_memory: bool = False):
+        self.sample_rate = sample_rate
+        self.threshold_ms = threshold_ms
+        self.trace_memory = trace_memory
+        self.captures = deque(maxlen=keep)
+        self._busy = threading.Lock()
+
+    def start(self):
+        """Begin profiling this request if it is sampled; returns a handle or None"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        if not self._busy.acquire(blocking=False):
+            return None
+
+        if self.trace_memory:
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def finish(self, profile, elapsed_ms: float, label: str):
+        """Stop profiling; keep the capture if the request was slow"""
+        if profile is None:
+            return
+        try:
+            profile.disable()
+            peak_kb = None
+            if self.trace_memory:
+                peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+                tracemalloc.stop()
+
+            if elapsed_ms >= self.threshold_ms:
+                out = io.StringIO()
+                pstats.Stats(profile, stream=out).sort_stats('cumulative').print_stats(25)
+                self.captures.append({
+                    'label': label,
+                    'elapsed_ms': elapsed_ms,
+                    'peak_memory_kb': peak_kb,
+                    'captured_at': time.time(),
+                    'profile': out.getvalue(),
+                })
+        finally:
+            self._busy.release()
+
+
+# Process-wide registry used by the data, verification and web layers
+INSTRUMENTATION = Instrumentation()
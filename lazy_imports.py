@@ -0,0 +1,67 @@
+"""
+Lazy Imports for HealthVerify / PainEase
+Defers loading heavy libraries (numpy, pandas, cv2, PIL, plotly) until a
+module attribute is first used, so workers that never touch them start fast
+"""
+
+import importlib.util
+import sys
+import threading
+import types
+
+# One re-entrant lock for every lazy module: loading pandas touches the lazy
+# numpy on the same thread, and a single lock cannot deadlock on lock order
+_LOAD_LOCK = threading.RLock()
+
+
+class _LazyModule(types.ModuleType):
+    """Placeholder that executes the real module on first attribute access
+
+    importlib.util.LazyLoader before Python 3.12.3 switches the class before
+    executing the module, so a second thread could see it half-loaded (e.g.
+    ``pd.DataFrame`` missing during report fan-out). Here other threads wait
+    for the load to finish.
+    """
+
+    def __getattribute__(self, attr):
+        with _LOAD_LOCK:
+            # Threads that waited for the lock find the module already loaded
+            if object.__getattribute__(self, '__class__') is _LazyModule:
+                state = object.__getattribute__(self, '__spec__').loader_state
+                if state['loading']:
+                    # Re-entrant access from the module's own imports while it executes
+                    return types.ModuleType.__getattribute__(self, attr)
+                state['loading'] = True
+                try:
+                    state['loader'].exec_module(self)
+                finally:
+                    state['loading'] = False
+                self.__class__ = types.ModuleType
+        return getattr(self, attr)
+
+
+def lazy_import(name: str):
+    """Return module ``name``, executing it only on first attribute access
+
+    Modules already imported are returned as-is. A missing module raises
+    ImportError here, not later at first use.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    # Parents load eagerly so the submodule can be attached to them
+    parent_name, _, child_name = name.rpartition('.')
+    parent = importlib.import_module(parent_name) if parent_name else None
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+
+    module = importlib.util.module_from_spec(spec)
+    spec.loader_state = {'loader': spec.loader, 'loading': False}
+    module.__class__ = _LazyModule
+    sys.modules[name] = module
+
+    if parent is not None:
+        setattr(parent, child_name, module)
+    return module
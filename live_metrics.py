@@ -0,0 +1,92 @@
+"""
+Live Metrics Service for PainEase dashboards
+Reads running totals that the store maintains on every event, so dashboards
+in every worker agree and never scan history; plus the rolling counters
+the alert rules use
+"""
+
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from data_utils import SESSION_MINUTE_BOUNDS
+
+
+class RollingCounter:
+    """Event count over a sliding time window, kept in fixed-size buckets"""
+
+    def __init__(self, window_seconds: int = 86400, bucket_seconds: int = 60):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self._buckets = deque()
+        self._total = 0
+
+    def add(self, timestamp: float, amount: int = 1, now: float = None):
+        if timestamp <= (now or time.time()) - self.window_seconds:
+            return  # already outside the window
+        bucket = int(timestamp // self.bucket_seconds)
+        if self._buckets and self._buckets[-1][0] == bucket:
+            self._buckets[-1][1] += amount
+        elif not self._buckets or self._buckets[-1][0] < bucket:
+            self._buckets.append([bucket, amount])
+        else:
+            # Late event: fold into the newest bucket rather than reordering
+            self._buckets[-1][1] += amount
+        self._total += amount
+
+    def value(self, now: float = None) -> int:
+        oldest = int(((now or time.time()) - self.window_seconds) // self.bucket_seconds)
+        while self._buckets and self._buckets[0][0] <= oldest:
+            self._total -= self._buckets.popleft()[1]
+        return self._total
+
+
+def histogram_quantile(counts: List[int], bounds, q: float) -> Optional[float]:
+    """Estimate the ``q`` quantile (0-1) from bucket counts; None when empty
+
+    Interpolates linearly inside the bucket holding the quantile. The
+    open-ended last bucket reports its lower bound.
+    """
+    total = sum(counts)
+    if not total:
+        return None
+
+    target = q * total
+    cumulative = 0
+    for index, count in enumerate(counts):
+        if count and cumulative + count >= target:
+            lower = bounds[index - 1] if index else 0
+            upper = bounds[index] if index < len(bounds) else lower
+            return lower + (upper - lower) * (target - cumulative) / count
+        cumulative += count
+    return bounds[-1]
+
+
+class MetricsService:
+    """Dashboard values for assessments and pain relief outcomes
+
+    SecureDataManager updates the live_metric_* totals in the same
+    transaction as each assessment, pain update and relief session, so
+    every worker and Streamlit session reports the same numbers. A snapshot
+    reads a few dozen precomputed rows.
+    """
+
+    def __init__(self, data_manager, window_seconds: int = 86400):
+        self.data_manager = data_manager
+        self.window_seconds = window_seconds
+
+    def snapshot(self) -> Dict:
+        """Current dashboard values; no history is scanned"""
+        live = self.data_manager.get_live_metrics(self.window_seconds)
+        outcomes = live['outcomes_total']
+        sessions = live['session_minute_counts']
+        return {
+            'assessments_total': live['assessments_total'],
+            'assessments_24h': live['assessments_recent'],
+            'outcomes_total': outcomes,
+            'outcomes_24h': live['outcomes_recent'],
+            'avg_pain_reduction': live['improvement_sum'] / outcomes if outcomes else 0.0,
+            'success_rate': live['improved_total'] / outcomes * 100 if outcomes else 0.0,
+            'session_minutes_p50': histogram_quantile(sessions, SESSION_MINUTE_BOUNDS, 0.5),
+            'session_minutes_p90': histogram_quantile(sessions, SESSION_MINUTE_BOUNDS, 0.9),
+        }
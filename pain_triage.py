@@ -0,0 +1,117 @@
+"""
+Pain triage rules shared by the PainEase web APIs
+Relief technique catalogue, emergency detection and recommendation rules
+"""
+
+# Pain relief techniques
+RELIEF_TECHNIQUES = {
+    'breathing': {
+        'name': 'Deep Breathing Exercise',
+        'description': 'Slow, controlled breathing to reduce pain and anxiety',
+        'duration': '5-10 minutes',
+        'steps': [
+            'Sit or lie down in a comfortable position',
+            'Place one hand on your chest, one on your belly',
+            'Breathe in slowly through your nose for 4 counts',
+            'Hold your breath for 4 counts',
+            'Exhale slowly through your mouth for 6 counts',
+            'Repeat 5-10 times'
+        ]
+    },
+    'positioning': {
+        'name': 'Comfort Positioning',
+        'description': 'Optimal positioning to reduce pressure and pain',
+        'duration': 'Ongoing',
+        'steps': [
+            'Find a comfortable chair or lying position',
+            'Use pillows to support painful areas',
+            'Elevate legs if experiencing lower body pain',
+            'Keep your spine neutral and supported',
+            'Change positions every 15-20 minutes'
+        ]
+    },
+    'distraction': {
+        'name': 'Mental Distraction',
+        'description': 'Redirect focus away from pain through mental exercises',
+        'duration': '10-15 minutes',
+        'steps': [
+            'Close your eyes and imagine a peaceful place',
+            'Count backwards from 100 by 7s',
+            'Name 5 things you can see, 4 you can hear, 3 you can touch',
+            'Listen to calming music or sounds',
+            'Focus on positive memories or experiences'
+        ]
+    },
+    'movement': {
+        'name': 'Gentle Movement',
+        'description': 'Light stretching and movement to improve circulation',
+        'duration': '5-10 minutes',
+        'steps': [
+            'Start with gentle neck rolls',
+            'Slowly roll your shoulders',
+            'Stretch your arms above your head',
+            'Gently twist your spine left and right',
+            'Do ankle circles if seated'
+        ],
+        'warning': 'Stop if movement increases pain'
+    }
+}
+
+PAIN_DESCRIPTIONS = {
+    1: "No pain", 2: "Mild pain", 3: "Moderate pain", 4: "Moderate-severe pain",
+    5: "Severe pain", 6: "Very severe pain", 7: "Intense pain", 
+    8: "Extremely intense pain", 9: "Excruciating pain", 10: "Unbearable pain"
+}
+
+def assess_pain_emergency(pain_level, symptoms):
+    """Check if pain assessment indicates emergency"""
+    if pain_level >= 8:
+        return True
+    
+    emergency_keywords = ['chest pain', 'difficulty breathing', 'severe headache', 
+                         'stroke', 'bleeding', 'fever', 'unconscious']
+    
+    for symptom in symptoms:
+        for keyword in emergency_keywords:
+            if keyword in symptom.lower():
+                return True
+    
+    return False
+
+def _select_techniques(pain_level, movement_allowed):
+    """Apply the recommendation rules for one pain level"""
+    recommendations = []
+    
+    if pain_level >= 4:
+        recommendations.append('breathing')
+    
+    recommendations.append('positioning')
+    
+    if pain_level >= 3:
+        recommendations.append('distraction')
+    
+    if pain_level <= 6 and movement_allowed:
+        recommendations.append('movement')
+    
+    return recommendations
+
+def build_recommendation_rules():
+    """Precompute technique lists for every pain level and movement contraindication"""
+    return {
+        (level, movement_allowed): tuple(RELIEF_TECHNIQUES[rec] for rec in _select_techniques(level, movement_allowed))
+        for level in PAIN_DESCRIPTIONS
+        for movement_allowed in (True, False)
+    }
+
+# Read-only rule table, built at import so preloaded workers share it
+RECOMMENDATION_RULES = build_recommendation_rules()
+
+def get_relief_recommendations(pain_level, pain_type, location, symptoms):
+    """Generate personalized relief recommendations"""
+    movement_allowed = location != 'chest' and 'shortness of breath' not in symptoms
+    
+    rule = RECOMMENDATION_RULES.get((pain_level, movement_allowed))
+    if rule is None:
+        rule = [RELIEF_TECHNIQUES[rec] for rec in _select_techniques(pain_level, movement_allowed)]
+    
+    return list(rule)
@@ -0,0 +1,76 @@
+"""
+Patient ID Pseudonymization for HealthVerify
+Keyed, cached hashing of patient identifiers into compact 32-byte pseudonyms
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import os
+import warnings
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+
+# Development fallback only; production deployments set PAINEASE_PSEUDONYM_KEY
+_DEVELOPMENT_KEY = b"healthverify_2024"
+
+DIGEST_SIZE = 32
+ALGORITHMS = ('blake2b', 'hmac-sha256')
+
+
+def load_key(env_var: str = 'PAINEASE_PSEUDONYM_KEY') -> bytes:
+    """Pseudonymization key from the environment (hex, or raw text)"""
+    value = os.environ.get(env_var)
+    if not value:
+        warnings.warn(f"{env_var} is not set; using the development pseudonymization key")
+        return _DEVELOPMENT_KEY
+    try:
+        return bytes.fromhex(value)
+    except ValueError:
+        return value.encode()
+
+
+class PatientPseudonymizer:
+    """Maps patient IDs to keyed 32-byte pseudonyms stored as BLOBs
+
+    The keyed hasher is built once and copied per ID, and recent IDs are
+    served from an LRU cache, so returning patients are not re-hashed.
+    """
+
+    def __init__(self, key: Optional[bytes] = None, algorithm: str = 'blake2b',
+                 cache_size: int = 65536):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {algorithm}")
+        key = key if key is not None else load_key()
+        self.algorithm = algorithm
+
+        if algorithm == 'blake2b':
+            # blake2b accepts keys of up to 64 bytes; longer ones are pre-hashed
+            if len(key) > hashlib.blake2b.MAX_KEY_SIZE:
+                key = hashlib.blake2b(key).digest()
+            self._template = hashlib.blake2b(key=key, digest_size=DIGEST_SIZE)
+        else:
+            self._template = hmac.new(key, digestmod=hashlib.sha256)
+
+        self.pseudonymize = lru_cache(maxsize=cache_size)(self._digest)
+
+    def _digest(self, patient_id: str) -> bytes:
+        hasher = self._template.copy()
+        hasher.update(patient_id.encode())
+        return hasher.digest()
+
+    def pseudonymize_many(self, patient_ids: Iterable[str]) -> np.ndarray:
+        """Pseudonyms for an array of IDs; each distinct ID is hashed once"""
+        unique, inverse = np.unique(np.asarray(patient_ids, dtype=str), return_inverse=True)
+        # Object dtype: fixed-width bytes ('S32') would strip trailing NUL bytes
+        digests = np.empty(len(unique), dtype=object)
+        digests[:] = [self.pseudonymize(patient_id) for patient_id in unique.tolist()]
+        return digests[inverse.ravel()]
+
+    def cache_info(self):
+        return self.pseudonymize.cache_info()
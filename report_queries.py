@@ -0,0 +1,179 @@
+"""
+Report Queries for HealthVerify / PainEase
+Named, parameterized statements behind the dashboard and compliance reports,
+kept compiled per connection, plus a query-plan check that they use indexes
+
+    python report_queries.py        # prints each plan; exits 1 on a table scan
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from typing import Dict, List, NamedTuple, Sequence
+
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+
+
+class ReportQuery(NamedTuple):
+    name: str
+    sql: str
+    # Representative parameters for EXPLAIN QUERY PLAN
+    sample_params: tuple
+
+
+REPORT_QUERIES: Dict[str, ReportQuery] = {}
+
+
+def _query(name: str, sql: str, sample_params: tuple = ()):
+    REPORT_QUERIES[name] = ReportQuery(name, sql, sample_params)
+
+
+_query('analytics_categories', '''
+SELECT category, COUNT(*) as count
+FROM verifications
+WHERE created_timestamp >= ?
+GROUP BY category
+ORDER BY category
+''', ('2024-01-01',))
+
+_query('analytics_daily_trends', '''
+SELECT substr(created_timestamp, 1, 10) as date,
+       category,
+       COUNT(*) as count
+FROM verifications
+WHERE created_timestamp >= ?
+GROUP BY substr(created_timestamp, 1, 10), category
+ORDER BY date, category
+''', ('2024-01-01',))
+
+_query('analytics_confidence', '''
+SELECT
+    CASE
+        WHEN confidence >= 90 THEN 'High (90-100%)'
+        WHEN confidence >= 70 THEN 'Medium (70-89%)'
+        ELSE 'Low (<70%)'
+    END as confidence_range,
+    COUNT(*) as count
+FROM verifications
+WHERE created_timestamp >= ?
+GROUP BY confidence_range
+ORDER BY confidence_range
+''', ('2024-01-01',))
+
+_query('analytics_red_flags', '''
+SELECT MAX(red_flags) as red_flags, COUNT(*) as count
+FROM verifications
+WHERE created_timestamp >= ?
+AND red_flags != '[]'
+''', ('2024-01-01',))
+
+# A half-open timestamp range rather than substr(...) = ?, so the index applies
+_query('daily_summary', '''
+SELECT
+    COUNT(*) as total_verifications,
+    SUM(CASE WHEN category = 'citizen' THEN 1 ELSE 0 END) as citizens,
+    SUM(CASE WHEN category = 'legal_immigrant' THEN 1 ELSE 0 END) as legal_immigrants,
+    SUM(CASE WHEN category = 'undocumented' THEN 1 ELSE 0 END) as undocumented,
+    SUM(CASE WHEN document_valid = TRUE THEN 1 ELSE 0 END) as valid_documents,
+    AVG(confidence) as avg_confidence
+FROM verifications
+WHERE created_timestamp >= ? AND created_timestamp < ?
+''', ('2024-01-01', '2024-01-02'))
+
+_query('fraud_flagged', '''
+SELECT red_flags, created_timestamp, confidence, category
+FROM verifications
+WHERE created_timestamp >= ?
+AND red_flags != '[]'
+''', ('2024-01-01',))
+
+_query('compliance_retention', '''
+SELECT
+    COUNT(*) as total_records,
+    COALESCE(SUM(CASE WHEN expiry_date > ? THEN 1 ELSE 0 END), 0) as within_retention,
+    COALESCE(SUM(CASE WHEN expiry_date <= ? THEN 1 ELSE 0 END), 0) as expired_records
+FROM verifications
+''', ('2024-01-01', '2024-01-01'))
+
+_query('compliance_audit', '''
+SELECT COUNT(*) as audit_entries
+FROM audit_log
+WHERE timestamp >= ?
+''', ('2024-01-01',))
+
+_query('pain_progress_summary', '''
+SELECT COUNT(*), AVG(improvement), SUM(CASE WHEN improvement > 0 THEN 1 ELSE 0 END)
+FROM pain_progress
+WHERE created_timestamp >= ?
+''', ('2024-01-01',))
+
+_query('relief_sessions_by_hour', '''
+SELECT substr(created_timestamp, 12, 2) as hour, COUNT(*) as sessions
+FROM relief_sessions
+WHERE created_timestamp >= ? AND created_timestamp < ?
+GROUP BY substr(created_timestamp, 12, 2)
+ORDER BY hour
+''', ('2024-01-01', '2024-01-02'))
+
+
+
+def execute_report(backend, conn, name: str, params: Sequence = ()):
+    """Run the named report statement on ``conn``; returns the cursor"""
+    return backend.execute_named(conn, name, REPORT_QUERIES[name].sql, params)
+
+
+def read_report(backend, conn, name: str, params: Sequence = ()) -> 'pd.DataFrame':
+    """Run the named report statement into a DataFrame"""
+    cursor = execute_report(backend, conn, name, params)
+    columns = [column[0] for column in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns, coerce_float=True)
+
+
+def explain_query_plan(conn, query: ReportQuery) -> List[str]:
+    """SQLite's EXPLAIN QUERY PLAN detail lines for ``query``"""
+    rows = conn.execute('EXPLAIN QUERY PLAN ' + query.sql, query.sample_params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def unindexed_scans(conn) -> Dict[str, List[str]]:
+    """Plan steps that read a table without an index, by query name
+
+    A SEARCH uses an index to seek; a SCAN is only accepted when it walks a
+    covering index (every column comes from the index, never the table).
+    """
+    failures = {}
+    for query in REPORT_QUERIES.values():
+        scans = [detail for detail in explain_query_plan(conn, query)
+                 if detail.startswith('SCAN ') and 'COVERING INDEX' not in detail]
+        if scans:
+            failures[query.name] = scans
+    return failures
+
+
+def main():
+    from data_utils import SecureDataManager
+    from synthetic_data import SyntheticDataGenerator
+
+    with tempfile.TemporaryDirectory() as workdir:
+        manager = SecureDataManager(os.path.join(workdir, 'plans.db'))
+        SyntheticDataGenerator(seed=7).populate(manager, verifications=2000)
+        conn = manager.backend.connect()
+        conn.execute('ANALYZE')
+        for query in REPORT_QUERIES.values():
+            print(query.name)
+            for detail in explain_query_plan(conn, query):
+                print(f"    {detail}")
+        failures = unindexed_scans(conn)
+        conn.close()
+
+    for name, scans in failures.items():
+        print(f"\nFAIL {name}: " + '; '.join(scans))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
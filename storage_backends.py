@@ -0,0 +1,329 @@
+"""
+Storage Backends for HealthVerify / PainEase
+Connection handling and SQL dialect differences behind SecureDataManager:
+SQLite (one file, the default) and PostgreSQL (pooled, for multi-node use)
+"""
+
+import io
+import re
+import sqlite3
+import threading
+import uuid
+import weakref
+from functools import lru_cache
+from typing import Iterator, List, Sequence, Set
+
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+
+
+class BackendCursor:
+    """DB-API cursor that accepts the repo's ``?``-style SQL on any backend"""
+
+    def __init__(self, backend: 'StorageBackend', raw):
+        self.backend = backend
+        self.raw = raw
+
+    def execute(self, sql: str, params: Sequence = ()):
+        self.raw.execute(self.backend.translate(sql), tuple(params))
+        return self
+
+    def executemany(self, sql: str, seq_of_params):
+        self.raw.executemany(self.backend.translate(sql), [tuple(params) for params in seq_of_params])
+        return self
+
+    def fetchone(self):
+        return self.raw.fetchone()
+
+    def fetchall(self):
+        return self.raw.fetchall()
+
+    def fetchmany(self, size: int):
+        return self.raw.fetchmany(size)
+
+    @property
+    def rowcount(self) -> int:
+        return self.raw.rowcount
+
+    @property
+    def description(self):
+        return self.raw.description
+
+    def __iter__(self):
+        return iter(self.raw)
+
+
+class BackendConnection:
+    """Connection wrapper with sqlite3-like ``execute`` on every backend
+
+    ``close`` returns pooled connections to their pool instead of closing them.
+    """
+
+    def __init__(self, backend: 'StorageBackend', raw, release):
+        self.backend = backend
+        self.raw = raw
+        self._release = release
+
+    def cursor(self) -> BackendCursor:
+        return BackendCursor(self.backend, self.raw.cursor())
+
+    def execute(self, sql: str, params: Sequence = ()) -> BackendCursor:
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql: str, seq_of_params) -> BackendCursor:
+        return self.cursor().executemany(sql, seq_of_params)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        if self.raw is not None:
+            self._release(self.raw)
+            self.raw = None
+
+
+class StorageBackend:
+    """Base class; subclasses supply connections and dialect translation"""
+
+    name = 'base'
+    # Two-argument scalar min/max (SQLite overloads MIN/MAX; PostgreSQL has LEAST/GREATEST)
+    scalar_min = 'MIN'
+    scalar_max = 'MAX'
+
+    def connect(self, timeout: float = None) -> BackendConnection:
+        raise NotImplementedError
+
+    def reader(self) -> BackendConnection:
+        """Connection for repeated read-only report queries"""
+        return self.connect()
+
+    def execute_named(self, conn: BackendConnection, name: str, sql: str,
+                      params: Sequence = ()) -> BackendCursor:
+        """Run a registered statement; backends keep it compiled on ``conn``"""
+        return conn.execute(sql, params)
+
+    def translate(self, sql: str) -> str:
+        """Rewrite a ``?``-parameterized statement for this backend"""
+        return sql
+
+    def prepare_schema(self, conn: BackendConnection):
+        """Per-database settings applied before the tables are created"""
+
+    def table_columns(self, conn: BackendConnection, table: str) -> Set[str]:
+        raise NotImplementedError
+
+    def begin_write(self, conn: BackendConnection, table: str):
+        """Start a transaction that serializes writers of ``table``"""
+        raise NotImplementedError
+
+    def read_sql(self, conn: BackendConnection, sql: str, params: Sequence = ()) -> 'pd.DataFrame':
+        cursor = conn.execute(sql, params)
+        columns = [column[0] for column in cursor.description]
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=columns, coerce_float=True)
+
+    def stream(self, sql: str, params: Sequence = (), batch_size: int = 10000) -> Iterator[List]:
+        """Yield the column names, then batches of rows, without loading the full result"""
+        conn = self.connect()
+        try:
+            cursor = conn.execute(sql, params)
+            yield [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            conn.close()
+
+    def copy_rows(self, conn: BackendConnection, table: str, columns: List[str], rows: List[tuple]) -> int:
+        """Bulk-load rows into ``table`` inside the caller's transaction"""
+        conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            rows)
+        return len(rows)
+
+    def close(self):
+        """Release pooled resources"""
+
+
+class SQLiteBackend(StorageBackend):
+    """One SQLite file; a fresh connection per operation, WAL journaling"""
+
+    name = 'sqlite'
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._readers = threading.local()
+
+    def connect(self, timeout: float = None) -> BackendConnection:
+        raw = sqlite3.connect(self.path, timeout=timeout or self.timeout)
+        return BackendConnection(self, raw, lambda connection: connection.close())
+
+    def reader(self) -> BackendConnection:
+        # One long-lived connection per thread, so sqlite3's per-connection
+        # statement cache keeps report queries compiled between calls. Plain
+        # SELECTs run in autocommit, so each one sees the latest commit.
+        raw = getattr(self._readers, 'connection', None)
+        if raw is None:
+            raw = self._readers.connection = sqlite3.connect(self.path, timeout=self.timeout)
+        return BackendConnection(self, raw, lambda connection: None)
+
+    def close(self):
+        raw = getattr(self._readers, 'connection', None)
+        if raw is not None:
+            raw.close()
+            self._readers.connection = None
+
+    def prepare_schema(self, conn: BackendConnection):
+        # WAL lets readers proceed while a request thread is writing
+        conn.execute('PRAGMA journal_mode=WAL')
+
+    def table_columns(self, conn: BackendConnection, table: str) -> Set[str]:
+        return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+    def begin_write(self, conn: BackendConnection, table: str):
+        # Take the database write lock up front so check-then-write is atomic
+        conn.execute('BEGIN IMMEDIATE')
+
+    def read_sql(self, conn: BackendConnection, sql: str, params: Sequence = ()) -> 'pd.DataFrame':
+        return pd.read_sql_query(sql, conn.raw, params=list(params))
+
+
+# Column types in the shared DDL that PostgreSQL spells differently
+_POSTGRES_TYPES = ((re.compile(r'\bBLOB\b'), 'BYTEA'), (re.compile(r'\bREAL\b'), 'DOUBLE PRECISION'))
+
+
+@lru_cache(maxsize=512)
+def _to_pyformat(sql: str) -> str:
+    """``?`` placeholders to psycopg2's ``%s``; table DDL gets PostgreSQL types"""
+    if sql.lstrip().upper().startswith(('CREATE TABLE', 'ALTER TABLE')):
+        for pattern, replacement in _POSTGRES_TYPES:
+            sql = pattern.sub(replacement, sql)
+    return sql.replace('%', '%%').replace('?', '%s')
+
+
+def _to_numbered(sql: str) -> str:
+    """``?`` placeholders to PREPARE's ``$1``, ``$2``, ..."""
+    parts = sql.split('?')
+    return parts[0] + ''.join(f'${number}{part}' for number, part in enumerate(parts[1:], 1))
+
+
+class PostgresBackend(StorageBackend):
+    """PostgreSQL through a psycopg2 thread-safe connection pool
+
+    Exports stream through server-side (named) cursors and bulk loads use
+    COPY. psycopg2 is only imported when the backend is first used.
+    """
+
+    name = 'postgresql'
+    scalar_min = 'LEAST'
+    scalar_max = 'GREATEST'
+
+    def __init__(self, dsn: str, min_connections: int = 1, max_connections: int = 10):
+        self.dsn = dsn
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # Names PREPAREd on each pooled connection; prepared statements outlive transactions
+        self._prepared = weakref.WeakKeyDictionary()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    from psycopg2.pool import ThreadedConnectionPool
+                    self._pool = ThreadedConnectionPool(self.min_connections, self.max_connections, self.dsn)
+        return self._pool
+
+    def connect(self, timeout: float = None) -> BackendConnection:
+        pool = self.pool
+        return BackendConnection(self, pool.getconn(), lambda raw: self._release(pool, raw))
+
+    @staticmethod
+    def _release(pool, raw):
+        # Never hand a half-finished transaction to the next borrower
+        if not raw.closed:
+            raw.rollback()
+        pool.putconn(raw)
+
+    def execute_named(self, conn: BackendConnection, name: str, sql: str,
+                      params: Sequence = ()) -> BackendCursor:
+        prepared = self._prepared.setdefault(conn.raw, set())
+        if name not in prepared:
+            # No parameters, so psycopg2 passes the statement through untouched
+            conn.raw.cursor().execute(f'PREPARE {name} AS {_to_numbered(sql)}')
+            prepared.add(name)
+        arguments = f" ({', '.join('?' * len(params))})" if params else ''
+        return conn.execute(f'EXECUTE {name}{arguments}', params)
+
+    def translate(self, sql: str) -> str:
+        return _to_pyformat(sql)
+
+    def table_columns(self, conn: BackendConnection, table: str) -> Set[str]:
+        rows = conn.execute('''
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = ?
+        ''', (table,)).fetchall()
+        return {row[0] for row in rows}
+
+    def begin_write(self, conn: BackendConnection, table: str):
+        # psycopg2 has already opened a transaction; block concurrent writers of the table
+        conn.execute(f'LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE')
+
+    def stream(self, sql: str, params: Sequence = (), batch_size: int = 10000) -> Iterator[List]:
+        conn = self.connect()
+        try:
+            cursor = conn.raw.cursor(name=f'stream_{uuid.uuid4().hex}')
+            cursor.itersize = batch_size
+            cursor.execute(self.translate(sql), tuple(params))
+            rows = cursor.fetchmany(batch_size)
+            yield [column[0] for column in cursor.description]
+            while rows:
+                yield rows
+                rows = cursor.fetchmany(batch_size)
+            cursor.close()
+        finally:
+            conn.close()
+
+    def copy_rows(self, conn: BackendConnection, table: str, columns: List[str], rows: List[tuple]) -> int:
+        buffer = io.StringIO()
+        buffer.writelines(','.join(_copy_field(value) for value in row) + '\n' for row in rows)
+        buffer.seek(0)
+        conn.raw.cursor().copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        return len(rows)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+            self._prepared.clear()
+
+
+def _copy_field(value) -> str:
+    """One CSV field for COPY: unquoted empty is NULL, so every string is quoted"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return '\\x' + bytes(value).hex()
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def backend_from_url(url: str) -> StorageBackend:
+    """``postgresql://...``, ``sqlite:///path`` or a bare SQLite file path"""
+    if url.startswith(('postgresql://', 'postgres://')):
+        return PostgresBackend(url)
+    if url.startswith('sqlite:///'):
+        return SQLiteBackend(url[len('sqlite:///'):])
+    return SQLiteBackend(url)
@@ -0,0 +1,268 @@
+"""
+Storage Backend Conformance Checks for HealthVerify / PainEase
+Runs the same SecureDataManager scenarios against every storage backend so
+SQLite and PostgreSQL stay behaviourally identical
+
+    python storage_conformance.py                          # SQLite only
+    python storage_conformance.py --throwaway-postgres     # plus a temporary local PostgreSQL
+    python storage_conformance.py --postgres postgresql://localhost/scratch
+"""
+
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple
+
+from data_utils import ReportGenerator, SecureDataManager
+from storage_backends import PostgresBackend, SQLiteBackend
+from system_metrics import SystemMetricsRecorder
+from verification_cache import VerificationColumnCache
+
+CHECKS = []
+
+
+def check(func):
+    """Register ``func(manager)``; it raises AssertionError on a mismatch"""
+    CHECKS.append(func)
+    return func
+
+
+def _verification(patient_id: str, **overrides) -> dict:
+    record = {
+        'patient_id': patient_id,
+        'document_type': 'South African ID',
+        'category': 'citizen',
+        'eligibility': 'free_care',
+        'confidence': 92,
+        'document_valid': True,
+        'red_flags': [],
+    }
+    record.update(overrides)
+    return record
+
+
+@check
+def verification_history_round_trip(manager):
+    ids = [manager.store_verification(_verification(f'900101500908{i}')) for i in range(5)]
+    page = manager.get_verification_page(limit=2)
+    assert [row['id'] for row in page['verifications']] == ids[::-1][:2], page
+    rows = list(manager.iter_verifications(page_size=2, decode_red_flags=True))
+    assert [row['id'] for row in rows] == ids[::-1], rows
+    assert rows[0]['document_valid'] is True and rows[0]['red_flags'] == []
+
+
+@check
+def patient_history_and_reuse(manager):
+    manager.store_verification(_verification('8001015009087', confidence=60))
+    reusable = manager.store_verification(_verification('8001015009087'))
+    manager.store_verification(_verification('8001015009087', red_flags=['Unusual document wear patterns']))
+    history = manager.get_patient_history('8001015009087')
+    assert len(history) == 3, history
+    assert manager.find_reusable_verification('8001015009087')['id'] == reusable
+    assert manager.find_reusable_verification('0000000000000') is None
+
+
+@check
+def alert_deduplication_and_resolution(manager):
+    first = manager.create_alert('high_red_flag_rate', 'warning', 'Red flags above 20%')
+    second = manager.create_alert('high_red_flag_rate', 'warning', 'Red flags above 20%')
+    other = manager.create_alert('slow_verification', 'info', 'p95 above budget')
+    assert first == second != other
+    alerts = {alert['id']: alert for alert in manager.get_active_alerts()}
+    assert alerts[first]['occurrences'] == 2, alerts
+    assert manager.resolve_alert(first) and not manager.resolve_alert(first)
+    assert manager.resolve_alerts(alert_type='slow_verification') == 1
+    assert manager.get_active_alerts() == []
+
+
+@check
+def pain_tracking(manager):
+    assessment_id = manager.store_pain_assessment(
+        {'level': 7, 'type': 'sharp', 'location': 'back', 'duration': '1-6h', 'symptoms': []},
+        is_emergency=False, session_id='session-1')
+    assert manager.record_pain_progress(assessment_id, 4)['improvement'] == 3
+    assert manager.record_pain_progress('missing', 4) is None
+    assert [row['current_pain'] for row in manager.get_pain_progress('session-1')] == [4]
+    summary = manager.get_pain_progress_summary()
+    assert summary['updates'] == 1 and summary['avg_improvement'] == 3.0, summary
+
+    for before, after in ((7, 4), (6, 6)):
+        manager.record_relief_session({'technique': 'breathing', 'before_pain': before, 'after_pain': after,
+                                       'started_at': datetime.now() - timedelta(minutes=5)}, 'session-1')
+    effectiveness = manager.get_technique_effectiveness()
+    assert effectiveness == [{'technique': 'breathing', 'sessions': 2,
+                              'avg_improvement': 1.5, 'success_rate': 50.0}], effectiveness
+    live = manager.get_live_metrics()
+    assert live['assessments_total'] == 1 and live['outcomes_total'] == 3, live
+    assert (live['assessments_recent'], live['outcomes_recent']) == (1, 3), live
+    assert (live['improvement_sum'], live['improved_total']) == (3 + 3 + 0, 2), live
+    assert sum(live['session_minute_counts']) == 2, live
+    assert sum(manager.get_hourly_session_counts(datetime.now().date().isoformat())) == 2
+
+    # The totals rebuilt from history match the ones maintained on each write
+    conn = manager.backend.connect()
+    manager.rebuild_live_metrics(conn)
+    conn.commit()
+    conn.close()
+    assert manager.get_live_metrics() == live
+
+
+@check
+def bulk_insert_and_reports(manager):
+    from synthetic_data import SyntheticDataGenerator
+
+    generator = SyntheticDataGenerator(seed=7)
+    generator.populate(manager, verifications=500)
+    analytics = manager.get_analytics_data(30)
+    in_window = sum(row['count'] for row in analytics['category_distribution'])
+    assert 0 < in_window <= 500, analytics
+    assert sum(row['count'] for row in analytics['daily_trends']) == in_window
+
+    reports = ReportGenerator(manager)
+    cached = ReportGenerator(manager, cache=VerificationColumnCache(manager))
+    assert reports.generate_fraud_report(30) == cached.generate_fraud_report(30)
+    cached_analytics = cached.generate_analytics(30)
+    assert analytics['category_distribution'] == cached_analytics['category_distribution']
+    assert analytics['red_flags_summary'] == cached_analytics['red_flags_summary'], (
+        analytics['red_flags_summary'], cached_analytics['red_flags_summary'])
+
+    day = analytics['daily_trends'][-1]['date']
+    summary, cached_summary = reports.generate_daily_summary(day), cached.generate_daily_summary(day)
+    assert int(summary['total_verifications']) == cached_summary['total_verifications'], (summary, cached_summary)
+    assert reports.generate_compliance_report()['data_retention']['total_records'] >= 500
+
+
+
+@check
+def cached_red_flags_match_sql(manager):
+    # The newest flagged combination is not the largest, which MAX(red_flags) reports
+    for i, flag in enumerate(('Unusual document wear patterns', 'Altered photo')):
+        manager.store_verification(_verification(f'85010150090{i:02d}', red_flags=[flag]))
+    expected = manager.get_analytics_data(30)['red_flags_summary']
+    assert expected == [{'red_flags': '["Unusual document wear patterns"]', 'count': 2}], expected
+    cached = VerificationColumnCache(manager).analytics(30)['red_flags_summary']
+    assert cached == expected, cached
+
+@check
+def export_streams_every_row(manager):
+    for i in range(25):
+        manager.store_verification(_verification(f'75010150090{i:02d}'))
+    workdir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        filename = manager.export_data('verifications', batch_size=10)
+        with open(filename) as f:
+            lines = f.read().splitlines()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir)
+    assert lines[0].startswith('id,document_type') and len(lines) == 26, lines[:3]
+
+
+@check
+def system_metric_rollups(manager):
+    recorder = SystemMetricsRecorder(manager)
+    now = time.time() // 60 * 60
+    for value in (10.0, 30.0, 20.0):
+        recorder.record('verification_ms', value, now + 1)
+    recorder.flush()
+    recorder.record('verification_ms', 5.0, now + 2)
+    recorder.flush()
+    series = recorder.query('verification_ms', now - 60, now + 60)
+    assert len(series) == 1, series
+    assert (series[0]['count'], series[0]['min'], series[0]['max'], series[0]['mean']) == (4, 5.0, 30.0, 16.25), series
+
+
+def run_conformance(make_manager: Callable[[], SecureDataManager], label: str) -> List[Tuple[str, str]]:
+    """Run every check on a fresh manager; returns (check, error) for the failures"""
+    failures = []
+    for func in CHECKS:
+        try:
+            func(make_manager())
+            print(f"  {label:<10} {func.__name__:<40} ok")
+        except Exception:
+            failures.append((func.__name__, traceback.format_exc()))
+            print(f"  {label:<10} {func.__name__:<40} FAIL")
+    return failures
+
+
+@contextmanager
+def throwaway_postgres(bin_dir: str = None):
+    """Start a private PostgreSQL cluster in a temp dir; yields its DSN"""
+    initdb = shutil.which('initdb', path=bin_dir)
+    pg_ctl = shutil.which('pg_ctl', path=bin_dir)
+    if not initdb or not pg_ctl:
+        raise RuntimeError("initdb/pg_ctl not found; pass --pg-bin")
+
+    with tempfile.TemporaryDirectory(prefix='pg') as workdir:
+        data_dir = os.path.join(workdir, 'data')
+        subprocess.run([initdb, '-D', data_dir, '-U', 'postgres', '-A', 'trust', '--no-sync'],
+                       check=True, capture_output=True)
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        subprocess.run([pg_ctl, '-D', data_dir, '-l', os.path.join(workdir, 'postgres.log'), '-w',
+                        '-o', f"-p {port} -k {workdir} -c listen_addresses='' -c fsync=off", 'start'],
+                       check=True, capture_output=True)
+        try:
+            yield f'postgresql://postgres@/postgres?host={workdir}&port={port}'
+        finally:
+            subprocess.run([pg_ctl, '-D', data_dir, '-m', 'immediate', 'stop'], capture_output=True)
+
+
+def _run_postgres(dsn: str) -> List[Tuple[str, str]]:
+    backend = PostgresBackend(dsn, max_connections=4)
+
+    def make_manager():
+        # Fresh schema per check; only point this at a scratch database
+        conn = backend.connect()
+        conn.execute('DROP SCHEMA IF EXISTS public CASCADE')
+        conn.execute('CREATE SCHEMA public')
+        conn.commit()
+        conn.close()
+        return SecureDataManager(backend=backend)
+
+    try:
+        return run_conformance(make_manager, 'postgresql')
+    finally:
+        backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--postgres', metavar='DSN',
+                        help='scratch PostgreSQL database (its public schema is dropped)')
+    parser.add_argument('--throwaway-postgres', action='store_true',
+                        help='start a temporary local PostgreSQL cluster for the run')
+    parser.add_argument('--pg-bin', help='directory holding initdb and pg_ctl')
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        counter = iter(range(len(CHECKS)))
+        failures += run_conformance(
+            lambda: SecureDataManager(backend=SQLiteBackend(os.path.join(workdir, f'check_{next(counter)}.db'))),
+            'sqlite')
+
+    if args.throwaway_postgres:
+        with throwaway_postgres(args.pg_bin) as dsn:
+            failures += _run_postgres(dsn)
+    elif args.postgres:
+        failures += _run_postgres(args.postgres)
+
+    for name, error in failures:
+        print(f"\nFAIL {name}\n{error}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""
+System Metrics Ingestion for HealthVerify / PainEase
+Buffers performance samples in memory, writes them to system_metrics in
+batches and downsamples them into 1-minute, 1-hour and 1-day rollups
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List
+
+# Rollup table and bucket width (seconds) per resolution
+ROLLUPS = {
+    '1m': ('system_metrics_1m', 60),
+    '1h': ('system_metrics_1h', 3600),
+    '1d': ('system_metrics_1d', 86400),
+}
+
+# How long each resolution is kept, in seconds
+DEFAULT_RETENTION = {
+    'raw': 2 * 86400,
+    '1m': 14 * 86400,
+    '1h': 180 * 86400,
+    '1d': 5 * 365 * 86400,
+}
+
+logger = logging.getLogger(__name__)
+
+
+class SystemMetricsRecorder:
+    """Batched writer for the system_metrics table and its rollups
+
+    ``record`` only appends to an in-memory buffer; a background thread
+    flushes it every ``flush_interval`` seconds, or sooner once
+    ``max_buffer`` samples are waiting. The buffer never holds more than
+    ``max_buffer`` samples: while the database is unavailable, failed
+    batches are put back and the oldest samples are dropped.
+    """
+
+    def __init__(self, data_manager, flush_interval: float = 5.0,
+                 max_buffer: int = 1000, retention: Dict[str, int] = None,
+                 retention_interval: float = 3600.0):
+        self.backend = data_manager.backend
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.retention = dict(DEFAULT_RETENTION, **(retention or {}))
+        self.retention_interval = retention_interval
+
+        self._buffer = deque(maxlen=max_buffer)
+        self.dropped_samples = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._last_retention = 0.0
+
+    def record(self, name: str, value: float, timestamp: float = None):
+        """Queue one sample; never touches the database"""
+        self._ensure_flusher()
+        with self._lock:
+            if len(self._buffer) == self.max_buffer:
+                self.dropped_samples += 1
+            self._buffer.append((name, float(value), timestamp or time.time()))
+            full = len(self._buffer) >= self.max_buffer
+        if full:
+            self._wakeup.set()
+
+    @contextmanager
+    def timer(self, name: str):
+        """Record the wrapped block's duration in milliseconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - started) * 1000)
+
+    @property
+    def buffer_depth(self) -> int:
+        return len(self._buffer)
+
+    def _ensure_flusher(self):
+        # Started lazily per process so preforked workers each get their own
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            if self._pid is not None:
+                # Inherited from the parent across fork; the parent flushes these
+                self._buffer = deque(maxlen=self.max_buffer)
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name='system-metrics-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # The batch is back in the buffer; the next interval retries it
+                logger.exception("system metrics flush failed")
+
+    def stop(self):
+        """Stop the background thread and write whatever is buffered"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+    def flush(self) -> int:
+        """Write buffered samples and fold them into every rollup"""
+        with self._lock:
+            batch, self._buffer = list(self._buffer), deque(maxlen=self.max_buffer)
+        if not batch:
+            return 0
+
+        with self._flush_lock:
+            try:
+                self._write(batch)
+            except BaseException:
+                self._requeue(batch)
+                raise
+
+            if time.time() - self._last_retention >= self.retention_interval:
+                self.enforce_retention()
+
+        return len(batch)
+
+    def _write(self, batch: List[tuple]):
+        conn = self.backend.connect(timeout=30)
+        try:
+            cursor = conn.cursor()
+
+            cursor.executemany('''
+            INSERT INTO system_metrics (id, metric_name, metric_value, timestamp)
+            VALUES (?, ?, ?, ?)
+            ''', [(str(uuid.uuid4()), name, value, datetime.fromtimestamp(ts).isoformat())
+                  for name, value, ts in batch])
+
+            for table, width in ROLLUPS.values():
+                cursor.executemany(f'''
+                INSERT INTO {table}
+                (metric_name, bucket_start, sample_count, value_sum, value_min, value_max)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(metric_name, bucket_start) DO UPDATE SET
+                    sample_count = {table}.sample_count + excluded.sample_count,
+                    value_sum = {table}.value_sum + excluded.value_sum,
+                    value_min = {self.backend.scalar_min}({table}.value_min, excluded.value_min),
+                    value_max = {self.backend.scalar_max}({table}.value_max, excluded.value_max)
+                ''', [(name, bucket, *stats) for (name, bucket), stats in _aggregate(batch, width).items()])
+
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _requeue(self, batch: List[tuple]):
+        """Put a failed batch back ahead of newer samples, keeping the newest max_buffer"""
+        with self._lock:
+            waiting = len(batch) + len(self._buffer)
+            self._buffer = deque(batch + list(self._buffer), maxlen=self.max_buffer)
+            self.dropped_samples += waiting - len(self._buffer)
+
+    def enforce_retention(self, now: float = None) -> Dict[str, int]:
+        """Delete samples older than each resolution's retention period"""
+        now = now or time.time()
+        self._last_retention = now
+        removed = {}
+
+        conn = self.backend.connect(timeout=30)
+        try:
+            cursor = conn.cursor()
+
+            cursor.execute('DELETE FROM system_metrics WHERE timestamp < ?',
+                           (datetime.fromtimestamp(now - self.retention['raw']).isoformat(),))
+            removed['raw'] = cursor.rowcount
+
+            for resolution, (table, _) in ROLLUPS.items():
+                cursor.execute(f'DELETE FROM {table} WHERE bucket_start < ?',
+                               (int(now - self.retention[resolution]),))
+                removed[resolution] = cursor.rowcount
+
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        return removed
+
+    def query(self, metric_name: str, start: float, end: float = None,
+              resolution: str = '1m') -> List[Dict]:
+        """Rolled-up series for charting, one row per bucket"""
+        table, _ = ROLLUPS[resolution]
+
+        conn = self.backend.connect()
+        cursor = conn.cursor()
+
+        cursor.execute(f'''
+        SELECT bucket_start, sample_count, value_sum, value_min, value_max
+        FROM {table}
+        WHERE metric_name = ? AND bucket_start >= ? AND bucket_start <= ?
+        ORDER BY bucket_start
+        ''', (metric_name, int(start), int(end or time.time())))
+
+        results = cursor.fetchall()
+        conn.close()
+
+        return [{
+            'timestamp': datetime.fromtimestamp(row[0]).isoformat(),
+            'count': row[1],
+            'mean': row[2] / row[1],
+            'min': row[3],
+            'max': row[4]
+        } for row in results]
+
+
+def _aggregate(batch, width: int) -> Dict:
+    """(name, bucket start) -> [count, sum, min, max] for one resolution"""
+    buckets = defaultdict(lambda: [0, 0.0, float('inf'), float('-inf')])
+    for name, value, ts in batch:
+        stats = buckets[(name, int(ts // width) * width)]
+        stats[0] += 1
+        stats[1] += value
+        stats[2] = min(stats[2], value)
+        stats[3] = max(stats[3], value)
+    return buckets
@@ -0,0 +1,240 @@
+"""
+Columnar Verification Cache for HealthVerify reporting
+Keeps the report-relevant verification columns in memory as NumPy arrays,
+refreshed by pulling only rows near or past a created_timestamp high-water mark
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from instrumentation import INSTRUMENTATION
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+NS_PER_DAY = 86_400 * 10 ** 9
+
+# Rows are timestamped in Python before their transaction commits, so a slow
+# writer can commit a row older than one already pulled. Every refresh re-reads
+# this far behind the high-water mark and skips the ids it already holds.
+COMMIT_LAG = timedelta(minutes=5)
+
+# Low-cardinality text columns, stored as integer codes into a per-column vocabulary
+CATEGORICAL_COLUMNS = ('category', 'eligibility', 'red_flags')
+
+CONFIDENCE_RANGES = ((90, 'High (90-100%)'), (70, 'Medium (70-89%)'), (None, 'Low (<70%)'))
+
+
+class VerificationColumnCache:
+    """In-process columnar copy of the verifications table for reports
+
+    ``refresh`` appends rows it has not seen yet, re-reading COMMIT_LAG
+    behind the newest timestamp so late commits are not missed; it falls back
+    to a full rebuild when the database reports that rows were deleted or
+    back-filled (the ``table_generations`` entry changed). Report methods
+    refresh first, then work on a consistent snapshot of the arrays, and
+    return the same shapes as their SQL counterparts.
+    """
+
+    def __init__(self, data_manager):
+        self.data_manager = data_manager
+        self._lock = threading.Lock()
+        self._vocab: Dict[str, List[str]] = {}
+        self._columns: Dict[str, np.ndarray] = {}
+        self._high_water = None
+        # Ids of the rows within COMMIT_LAG of the high-water mark, by timestamp
+        self._recent: Dict[str, str] = {}
+        self._generation = None
+
+    def __len__(self) -> int:
+        return len(self._columns.get('created', ()))
+
+    def rebuild(self):
+        with self._lock:
+            self._reset(self.data_manager.table_generation('verifications'))
+            self._pull()
+
+    def refresh(self) -> int:
+        """Pull new rows; returns how many were added"""
+        with self._lock:
+            generation = self.data_manager.table_generation('verifications')
+            if self._generation != generation:
+                self._reset(generation)
+            return self._pull()
+
+    def _reset(self, generation: int):
+        self._vocab = {name: [] for name in CATEGORICAL_COLUMNS}
+        self._columns = {
+            'created': np.empty(0, dtype=np.int64),
+            'confidence': np.empty(0, dtype=np.int16),
+            'document_valid': np.empty(0, dtype=bool),
+            **{name: np.empty(0, dtype=np.int32) for name in CATEGORICAL_COLUMNS},
+        }
+        self._high_water = None
+        self._recent = {}
+        self._generation = generation
+
+    def _pull(self) -> int:
+        query = '''
+        SELECT id, category, eligibility, confidence, document_valid, red_flags, created_timestamp
+        FROM verifications
+        {}
+        ORDER BY created_timestamp, id
+        '''
+        backend = self.data_manager.backend
+        conn = backend.connect()
+        with INSTRUMENTATION.timer('cache.verifications_refresh_ms'):
+            if self._high_water is None:
+                delta = backend.read_sql(conn, query.format(''))
+            else:
+                since = (datetime.fromisoformat(self._high_water) - COMMIT_LAG).isoformat()
+                delta = backend.read_sql(conn, query.format('WHERE created_timestamp >= ?'), (since,))
+        conn.close()
+
+        if self._recent:
+            delta = delta[~delta['id'].isin(list(self._recent))]
+        if delta.empty:
+            return 0
+
+        delta['red_flags'] = delta['red_flags'].fillna('[]')
+        appended = {
+            'created': pd.to_datetime(delta['created_timestamp'], format='ISO8601')
+                         .to_numpy('datetime64[ns]').view(np.int64),
+            'confidence': delta['confidence'].to_numpy(np.int16),
+            'document_valid': delta['document_valid'].to_numpy(bool),
+        }
+        for name in CATEGORICAL_COLUMNS:
+            appended[name] = self._encode(name, delta[name])
+
+        # Replace (never mutate) the arrays so reports holding a snapshot stay consistent
+        self._columns = {name: np.concatenate([self._columns[name], values])
+                         for name, values in appended.items()}
+
+        self._high_water = max(self._high_water or '', delta['created_timestamp'].max())
+        cutoff = (datetime.fromisoformat(self._high_water) - COMMIT_LAG).isoformat()
+        self._recent.update(zip(delta['id'], delta['created_timestamp']))
+        self._recent = {row_id: created for row_id, created in self._recent.items() if created >= cutoff}
+        return len(delta)
+
+    def _encode(self, name: str, values) -> np.ndarray:
+        codes, uniques = pd.factorize(values)
+        vocab = self._vocab[name]
+        index = {value: code for code, value in enumerate(vocab)}
+        for value in uniques:
+            if value not in index:
+                index[value] = len(vocab)
+                vocab.append(value)
+        lookup = np.array([index[value] for value in uniques], dtype=np.int32)
+        return lookup[codes]
+
+    def _snapshot(self, days: Optional[int] = None):
+        self.refresh()
+        columns, vocab = self._columns, {name: list(values) for name, values in self._vocab.items()}
+        if days is None:
+            return columns, vocab
+        # Same cut-off as SQLite's date('now', '-N days'): UTC midnight N days ago
+        cutoff = datetime.now(timezone.utc).date() - timedelta(days=days)
+        mask = columns['created'] >= np.datetime64(cutoff, 'ns').view(np.int64)
+        return {name: values[mask] for name, values in columns.items()}, vocab
+
+    @staticmethod
+    def _counts(codes: np.ndarray, labels: List[str]) -> Dict[str, int]:
+        counts = np.bincount(codes, minlength=len(labels))
+        return {labels[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def analytics(self, days: int = 30) -> Dict:
+        """Dashboard analytics, as SecureDataManager.get_analytics_data"""
+        columns, vocab = self._snapshot(days)
+        categories = vocab['category']
+
+        category_counts = self._counts(columns['category'], categories)
+        category_distribution = [{'category': category, 'count': category_counts[category]}
+                                 for category in sorted(category_counts)]
+
+        # Group by (day, category) through one combined integer key
+        day = columns['created'] // NS_PER_DAY
+        keys, counts = np.unique(day * max(1, len(categories)) + columns['category'], return_counts=True)
+        key_days, key_categories = np.divmod(keys, max(1, len(categories)))
+        daily_trends = sorted(
+            ({'date': str(np.datetime64(int(d), 'D')), 'category': categories[c], 'count': int(n)}
+             for d, c, n in zip(key_days, key_categories, counts)),
+            key=lambda row: (row['date'], row['category']))
+
+        confidence = columns['confidence']
+        labels = [label for _, label in CONFIDENCE_RANGES]
+        bins = np.select([confidence >= 90, confidence >= 70], [0, 1], default=2)
+        range_counts = self._counts(bins, labels)
+        confidence_distribution = [{'confidence_range': label, 'count': range_counts[label]}
+                                   for label in sorted(range_counts)]
+
+        # MAX(red_flags) in SQL: the lexicographically largest flagged combination
+        flagged = columns['red_flags'][columns['red_flags'] != self._clean_code(vocab)]
+        red_flags_summary = [{
+            'red_flags': max(vocab['red_flags'][code] for code in np.unique(flagged)) if len(flagged) else None,
+            'count': int(len(flagged)),
+        }]
+
+        return {
+            'category_distribution': category_distribution,
+            'daily_trends': daily_trends,
+            'confidence_distribution': confidence_distribution,
+            'red_flags_summary': red_flags_summary,
+            'total_verifications': len(daily_trends)
+        }
+
+    @staticmethod
+    def _clean_code(vocab) -> int:
+        """Code of the empty red-flag list, or -1 if no row has it"""
+        try:
+            return vocab['red_flags'].index('[]')
+        except ValueError:
+            return -1
+
+    def fraud_report(self, days: int = 30, top_flags: Optional[int] = 10) -> Dict:
+        """Fraud detection report, as ReportGenerator.generate_fraud_report"""
+        columns, vocab = self._snapshot(days)
+        flagged = columns['red_flags'] != self._clean_code(vocab)
+        total_flagged = int(flagged.sum())
+
+        # Parse each distinct flag combination once, weighted by how often it occurs
+        flag_counts = Counter()
+        for combination, count in self._counts(columns['red_flags'][flagged], vocab['red_flags']).items():
+            for flag in json.loads(combination):
+                flag_counts[flag] += count
+
+        risk = self._counts(columns['category'][flagged], vocab['category'])
+
+        return {
+            'total_flagged_cases': total_flagged,
+            'fraud_rate': total_flagged / max(1, total_flagged) * 100,
+            'common_flags': dict(flag_counts.most_common(top_flags)),
+            'risk_by_category': {category: risk[category] for category in sorted(risk)}
+        }
+
+    def daily_summary(self, date: str) -> Dict:
+        """Daily summary report, as ReportGenerator.generate_daily_summary"""
+        columns, vocab = self._snapshot()
+        day = np.datetime64(date, 'D').astype(np.int64)
+        mask = columns['created'] // NS_PER_DAY == day
+        total = int(mask.sum())
+        if total == 0:
+            return {'date': date, 'no_data': True}
+
+        categories = self._counts(columns['category'][mask], vocab['category'])
+        valid = int(columns['document_valid'][mask].sum())
+        return {
+            'total_verifications': total,
+            'citizens': categories.get('citizen', 0),
+            'legal_immigrants': categories.get('legal_immigrant', 0),
+            'undocumented': categories.get('undocumented', 0),
+            'valid_documents': valid,
+            'avg_confidence': float(columns['confidence'][mask].mean()),
+            'date': date,
+            'validity_rate': valid / total * 100
+        }
@@ -0,0 +1,11 @@
+"""
+Production WSGI entry point for the PainEase Flask app
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import os
+
+from flask_app import create_app
+
+app = create_app(os.environ.get('PAINEASE_ENV', 'production'))